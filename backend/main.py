@@ -10,8 +10,10 @@ import sys
 import asyncio
 import logging
 import random
+import time
+import hashlib
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 from contextlib import asynccontextmanager
 
 # Load environment variables from .env file
@@ -31,12 +33,14 @@ load_env_file()
 # Now import the rest of the modules
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Query, APIRouter, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from pydantic_settings import BaseSettings
 import uvicorn
 
 import json # Added for json.loads
 import httpx
+import numpy as np
+import orjson
 
 from fastapi.responses import JSONResponse, Response, StreamingResponse
 
@@ -50,7 +54,7 @@ from ai_commentary_service import get_commentary_service, AICommentaryService, C
 from p2p_earthquake_service import (
     P2PEarthquakeService, P2PAPIConfig, InformationCode,
     JMAQuake, JMATsunami, EEW, EEWDetection, Userquake, UserquakeEvaluation,
-    scale_int_to_string, parse_p2p_time
+    scale_int_to_string, scale_ints_to_strings, parse_p2p_time
 )
 from social_media_automation import init_social_media_automation, social_media_automation
 from social_media_config import PostType
@@ -63,6 +67,7 @@ class Settings(BaseSettings):
     port: int = 8000
     host: str = "0.0.0.0"  # Changed from localhost to bind to all interfaces
     log_level: str = "INFO"
+    workers: int = 1  # WebSocket clients and caches are per-process state
     
     # API URLs
     jma_api_base_url: str = "https://www.jma.go.jp/bosai/forecast/data/forecast/"
@@ -394,13 +399,16 @@ async def lifespan(app: FastAPI):
             enable_websocket=True,  # Enable WebSocket for real-time monitoring
             websocket_reconnect_interval=30,
             api_timeout=10,
-            rate_limit_delay=1.0
+            rate_limit_delay=1.0,
+            redis_url=os.getenv('REDIS_URL')  # Shared response cache across workers (optional)
         )
         p2p_earthquake_service = P2PEarthquakeService(p2p_config)
         await p2p_earthquake_service.initialize()
         
         # Register callbacks for real-time data processing
         def on_earthquake_callback(data: JMAQuake):
+            invalidate_response_cache("seismic_stations", "p2p_status")
+            _latest_quakes_cache["t"] = 0.0
             logger.info(f"P2P地震情報受信: {data.earthquake.hypocenter.name if data.earthquake.hypocenter else '不明'} M{data.earthquake.hypocenter.magnitude if data.earthquake.hypocenter else '不明'}")
         
         def on_tsunami_callback(data: JMATsunami):
@@ -514,6 +522,9 @@ async def lifespan(app: FastAPI):
         await p2p_earthquake_service.cleanup()
         logger.info("✓ P2P earthquake service cleaned up")
     
+    if social_media_automation:
+        await social_media_automation.close()
+    
     if chat_analyzer:
         if hasattr(chat_analyzer, 'stop_monitoring'):
             chat_analyzer.stop_monitoring()
@@ -3285,6 +3296,19 @@ async def get_p2p_history(
         logger.error(f"Error fetching P2P history: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch P2P history data")
 
+def _serialize_quake_points(points) -> List[Dict[str, Any]]:
+    """Observation points with their scale strings, converted in one batch"""
+    return [
+        {
+            "pref": point.pref,
+            "addr": point.addr,
+            "isArea": point.isArea,
+            "scale": point.scale,
+            "scaleString": scale_string
+        }
+        for point, scale_string in zip(points, scale_ints_to_strings([point.scale for point in points]))
+    ]
+
 @app.get("/api/p2p/jma/quakes")
 async def get_p2p_jma_quakes(
     limit: int = Query(10, ge=1, le=100, description="返却件数"),
@@ -3342,16 +3366,7 @@ async def get_p2p_jma_quakes(
                         "domesticTsunami": quake.earthquake.domesticTsunami,
                         "foreignTsunami": quake.earthquake.foreignTsunami
                     },
-                    "points": [
-                        {
-                            "pref": point.pref,
-                            "addr": point.addr,
-                            "isArea": point.isArea,
-                            "scale": point.scale,
-                            "scaleString": scale_int_to_string(point.scale)
-                        }
-                        for point in quake.points or []
-                    ],
+                    "points": _serialize_quake_points(quake.points or []),
                     "comments": quake.comments.dict() if quake.comments else None
                 }
                 for quake in jma_quakes
@@ -3609,8 +3624,136 @@ async def get_p2p_latest_eew(limit: int = Query(10, ge=1, le=50, description="
         logger.error(f"Error fetching latest EEW: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch latest EEW data")
 
+# Seismic station constants (built once, shared read-only across requests)
+_DEFAULT_STATIONS = (
+    {"id": "1", "name": "北海道", "location": "釧路", "prefecture": "北海道", "intensity": 0, "latitude": 42.9849, "longitude": 144.3819},
+    {"id": "2", "name": "北海道", "location": "苫小牧", "prefecture": "北海道", "intensity": 0, "latitude": 42.6343, "longitude": 141.6059},
+    {"id": "3", "name": "新潟県", "location": "新潟", "prefecture": "新潟県", "intensity": 0, "latitude": 37.9161, "longitude": 139.0364},
+    {"id": "4", "name": "石川県", "location": "正院", "prefecture": "石川県", "intensity": 0, "latitude": 37.4479, "longitude": 137.2778},
+    {"id": "5", "name": "埼玉県", "location": "岩槻", "prefecture": "埼玉県", "intensity": 0, "latitude": 35.9494, "longitude": 139.6946},
+    {"id": "6", "name": "東京都", "location": "新宿", "prefecture": "東京都", "intensity": 0, "latitude": 35.6896, "longitude": 139.6917},
+    {"id": "7", "name": "神奈川県", "location": "相模原", "prefecture": "神奈川県", "intensity": 0, "latitude": 35.5707, "longitude": 139.3683},
+    {"id": "8", "name": "大阪府", "location": "堺", "prefecture": "大阪府", "intensity": 0, "latitude": 34.5733, "longitude": 135.4828},
+    {"id": "9", "name": "宮崎県", "location": "都城", "prefecture": "宮崎県", "intensity": 0, "latitude": 31.7190, "longitude": 131.0619},
+    {"id": "10", "name": "沖縄県", "location": "名護", "prefecture": "沖縄県", "intensity": 0, "latitude": 26.5917, "longitude": 127.9769},
+)
+_DEFAULT_STATIONS_JSON = orjson.dumps(_DEFAULT_STATIONS)
+
+# Monitoring stations used for simulated waveforms
+_MONITOR_STATIONS = (
+    {"id": "1", "name": "北海道", "location": "釧路支庁釧路", "lat": 42.98, "lng": 144.38},
+    {"id": "2", "name": "北海道", "location": "胆振支庁苫小牧", "lat": 42.63, "lng": 141.60},
+    {"id": "3", "name": "新潟県", "location": "新潟", "lat": 37.90, "lng": 139.02},
+    {"id": "4", "name": "石川県", "location": "正院", "lat": 37.47, "lng": 137.26},
+    {"id": "5", "name": "埼玉県", "location": "岩槻", "lat": 35.94, "lng": 139.69},
+    {"id": "6", "name": "東京都", "location": "新宿", "lat": 35.69, "lng": 139.70},
+    {"id": "7", "name": "神奈川県", "location": "相模原", "lat": 35.55, "lng": 139.37},
+    {"id": "8", "name": "大阪府", "location": "堺", "lat": 34.57, "lng": 135.47},
+    {"id": "9", "name": "宮崎県", "location": "都城", "lat": 31.72, "lng": 131.06},
+    {"id": "10", "name": "沖縄県", "location": "名護", "lat": 26.59, "lng": 127.97},
+)
+_MONITOR_STATIONS_NP = np.array([(s["lat"], s["lng"]) for s in _MONITOR_STATIONS], dtype=np.float64)
+
+
+def _default_stations_payload(**extra) -> bytes:
+    """Build the default-stations payload around the pre-serialized station list"""
+    tail = orjson.dumps({"lastUpdate": datetime.now(), "source": "default", **extra})
+    return b'{"stations":' + _DEFAULT_STATIONS_JSON + b"," + tail[1:]
+
+def _default_stations_response(**extra) -> Response:
+    return Response(content=_default_stations_payload(**extra), media_type="application/json")
+
+
+# Short-lived response cache for polled status endpoints: key -> (expires_at, json bytes, etag)
+_response_cache: Dict[str, tuple] = {}
+_response_cache_locks: Dict[str, asyncio.Lock] = {}
+
+def _opaque_tag(etag: str) -> str:
+    """ETag without its weak prefix, for If-None-Match's weak comparison"""
+    return etag[2:] if etag.startswith("W/") else etag
+
+def _etag_response(request: Request, payload: bytes, etag: str, max_age: int) -> Response:
+    """Return ``payload`` with validators, or 304 when the client already has it"""
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+    if_none_match = request.headers.get("if-none-match")
+    # If-None-Match uses weak comparison: W/"x" and "x" match each other
+    opaque = _opaque_tag(etag)
+    if if_none_match and (if_none_match.strip() == "*" or opaque in (_opaque_tag(tag.strip()) for tag in if_none_match.split(","))):
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload, media_type="application/json", headers=headers)
+
+async def _cached_json_response(request: Request, key: str, ttl: float, producer, etag_source=None, max_age: int = 2) -> Response:
+    """Serve a JSON response from the TTL cache, calling ``producer`` once per expiry.
+
+    ``producer`` is an async callable returning either a dict or pre-encoded bytes.
+    Concurrent misses for the same key wait on a single producer call. The ETag is
+    ``etag_source(value)`` (a complete, quoted validator) when given and not None,
+    otherwise a strong digest of the body.
+    """
+    entry = _response_cache.get(key)
+    if entry and entry[0] > time.monotonic():
+        return _etag_response(request, entry[1], entry[2], max_age)
+    
+    lock = _response_cache_locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        entry = _response_cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            return _etag_response(request, entry[1], entry[2], max_age)
+        
+        value = await producer()
+        payload = value if isinstance(value, bytes) else orjson.dumps(value)
+        etag = etag_source(value) if etag_source else None
+        etag = etag or f'"{hashlib.blake2b(payload, digest_size=8).hexdigest()}"'
+        _response_cache[key] = (time.monotonic() + ttl, payload, etag)
+    return _etag_response(request, payload, etag, max_age)
+
+def invalidate_response_cache(*keys: str):
+    """Drop cached responses so the next request rebuilds them"""
+    for key in keys:
+        _response_cache.pop(key, None)
+
+
+# Constant part of /api/p2p/status, encoded once without its outer braces
+_P2P_STATUS_STATIC_JSON = orjson.dumps({
+    "rate_limits": {
+        "history_api": "60 requests/minute",
+        "jma_api": "10 requests/minute",
+        "websocket": "Real-time"
+    },
+    "information_codes": {
+        "551": "地震情報",
+        "552": "津波予報",
+        "554": "緊急地震速報発表検出",
+        "555": "各地域ピア数",
+        "556": "緊急地震速報（警報）",
+        "561": "地震感知情報",
+        "9611": "地震感知情報解析結果"
+    }
+})[1:-1]
+
+async def _build_p2p_service_status() -> bytes:
+    """Assemble the /api/p2p/status payload around the pre-encoded static fields"""
+    status = p2p_earthquake_service.get_service_status()
+    dynamic = orjson.dumps({
+        "service_available": True,
+        "websocket_monitoring": status['is_monitoring'],
+        "websocket_connected": status['websocket_connected'],
+        "environment": "sandbox" if status['use_sandbox'] else "production",
+        "api_endpoints": {
+            "base_url": status['base_url'],
+            "websocket_url": status['ws_url']
+        },
+        "data_status": {
+            "latest_data_types": status['latest_data_count'],
+            "history_items": status['history_count'],
+            "registered_callbacks": status['registered_callbacks']
+        },
+        "last_updated": datetime.now()
+    })
+    return dynamic[:-1] + b"," + _P2P_STATUS_STATIC_JSON + b"}"
+
 @app.get("/api/p2p/status")
-async def get_p2p_service_status():
+async def get_p2p_service_status(request: Request):
     """P2P地震情報サービス状態取得"""
     if not p2p_earthquake_service:
         return {
@@ -3619,37 +3762,7 @@ async def get_p2p_service_status():
         }
     
     try:
-        status = p2p_earthquake_service.get_service_status()
-        return {
-            "service_available": True,
-            "websocket_monitoring": status['is_monitoring'],
-            "websocket_connected": status['websocket_connected'],
-            "environment": "sandbox" if status['use_sandbox'] else "production",
-            "api_endpoints": {
-                "base_url": status['base_url'],
-                "websocket_url": status['ws_url']
-            },
-            "data_status": {
-                "latest_data_types": status['latest_data_count'],
-                "history_items": status['history_count'],
-                "registered_callbacks": status['registered_callbacks']
-            },
-            "rate_limits": {
-                "history_api": "60 requests/minute",
-                "jma_api": "10 requests/minute",
-                "websocket": "Real-time"
-            },
-            "information_codes": {
-                "551": "地震情報",
-                "552": "津波予報", 
-                "554": "緊急地震速報発表検出",
-                "555": "各地域ピア数",
-                "556": "緊急地震速報（警報）",
-                "561": "地震感知情報",
-                "9611": "地震感知情報解析結果"
-            },
-            "last_updated": datetime.now().isoformat()
-        }
+        return await _cached_json_response(request, "p2p_status", 1.0, _build_p2p_service_status)
     except Exception as e:
         logger.error(f"Error getting P2P service status: {e}")
         return {
@@ -3657,127 +3770,97 @@ async def get_p2p_service_status():
             "error": str(e)
         }
 
+async def _build_seismic_stations():
+    """Assemble the /api/seismic/stations payload from the latest detailed quake"""
+    # Get recent earthquake with detailed scale information
+    quakes = await p2p_earthquake_service.get_jma_quakes(limit=1, order=-1, quake_type="DetailScale")
+    
+    if quakes:
+        latest_quake = quakes[0]
+        
+        # Extract observation points
+        points = latest_quake.points
+        if points:
+            quake_id = latest_quake.id
+            eq = latest_quake.earthquake
+            quake_time = eq.time
+            hypo = eq.hypocenter
+            
+            stations = [
+                {
+                    "id": str(idx),
+                    "name": point.pref,
+                    "location": point.addr,
+                    "prefecture": point.pref,
+                    "intensity": point.scale / 10.0,  # Convert to seismic intensity (震度)
+                    "isArea": point.isArea,
+                    "earthquakeId": quake_id,
+                    "earthquakeTime": quake_time,
+                }
+                for idx, point in enumerate(points[:50], 1)  # Limit to 50 stations
+            ]
+            
+            return {
+                "stations": stations,
+                "lastUpdate": datetime.now(),
+                "source": "p2p_earthquake",
+                "earthquake": {
+                    "id": quake_id,
+                    "time": quake_time,
+                    "maxScale": eq.maxScale / 10.0 if eq.maxScale else None,
+                    "hypocenter": {
+                        "name": hypo.name,
+                        "magnitude": hypo.magnitude,
+                    } if hypo else None
+                }
+            }
+    
+    # If no detailed earthquake data, return default stations
+    return _default_stations_payload()
+
+def _seismic_stations_etag(value) -> Optional[str]:
+    """Tag station payloads by their source earthquake so 304s track P2P updates
+
+    Weak, because lastUpdate in the body changes on every build for the same quake.
+    """
+    if isinstance(value, dict) and value["earthquake"]["id"]:
+        return f'W/"quake-{value["earthquake"]["id"]}"'
+    return None
+
 @app.get("/api/seismic/stations")
-async def get_seismic_stations():
+async def get_seismic_stations(request: Request):
     """Get seismic station data with intensity information from recent earthquakes"""
     if not p2p_earthquake_service:
         # Return default stations if service not available
         logger.warning("P2P earthquake service not available, returning default stations")
-        default_stations = [
-            {"id": "1", "name": "北海道", "location": "釧路", "prefecture": "北海道", "intensity": 0, "latitude": 42.9849, "longitude": 144.3819},
-            {"id": "2", "name": "北海道", "location": "苫小牧", "prefecture": "北海道", "intensity": 0, "latitude": 42.6343, "longitude": 141.6059},
-            {"id": "3", "name": "新潟県", "location": "新潟", "prefecture": "新潟県", "intensity": 0, "latitude": 37.9161, "longitude": 139.0364},
-            {"id": "4", "name": "石川県", "location": "正院", "prefecture": "石川県", "intensity": 0, "latitude": 37.4479, "longitude": 137.2778},
-            {"id": "5", "name": "埼玉県", "location": "岩槻", "prefecture": "埼玉県", "intensity": 0, "latitude": 35.9494, "longitude": 139.6946},
-            {"id": "6", "name": "東京都", "location": "新宿", "prefecture": "東京都", "intensity": 0, "latitude": 35.6896, "longitude": 139.6917},
-            {"id": "7", "name": "神奈川県", "location": "相模原", "prefecture": "神奈川県", "intensity": 0, "latitude": 35.5707, "longitude": 139.3683},
-            {"id": "8", "name": "大阪府", "location": "堺", "prefecture": "大阪府", "intensity": 0, "latitude": 34.5733, "longitude": 135.4828},
-            {"id": "9", "name": "宮崎県", "location": "都城", "prefecture": "宮崎県", "intensity": 0, "latitude": 31.7190, "longitude": 131.0619},
-            {"id": "10", "name": "沖縄県", "location": "名護", "prefecture": "沖縄県", "intensity": 0, "latitude": 26.5917, "longitude": 127.9769},
-        ]
-        return {"stations": default_stations, "lastUpdate": datetime.now().isoformat(), "source": "default"}
+        return _default_stations_response()
     
     try:
-        # Get recent earthquake with detailed scale information
-        quakes = await p2p_earthquake_service.get_jma_quakes(limit=1, order=-1, quake_type="DetailScale")
-        
-        if quakes and len(quakes) > 0:
-            latest_quake = quakes[0]
-            
-            # Extract observation points
-            if hasattr(latest_quake, 'points') and latest_quake.points:
-                stations = []
-                for idx, point in enumerate(latest_quake.points[:50]):  # Limit to 50 stations
-                    stations.append({
-                        "id": str(idx + 1),
-                        "name": point.pref,
-                        "location": point.addr,
-                        "prefecture": point.pref,
-                        "intensity": point.scale / 10.0,  # Convert to seismic intensity (震度)
-                        "isArea": point.isArea,
-                        "earthquakeId": latest_quake.id if hasattr(latest_quake, 'id') else None,
-                        "earthquakeTime": latest_quake.earthquake.time if hasattr(latest_quake, 'earthquake') else None,
-                    })
-                
-                return {
-                    "stations": stations,
-                    "lastUpdate": datetime.now().isoformat(),
-                    "source": "p2p_earthquake",
-                    "earthquake": {
-                        "id": latest_quake.id if hasattr(latest_quake, 'id') else None,
-                        "time": latest_quake.earthquake.time if hasattr(latest_quake, 'earthquake') else None,
-                        "maxScale": latest_quake.earthquake.maxScale / 10.0 if hasattr(latest_quake, 'earthquake') and latest_quake.earthquake.maxScale else None,
-                        "hypocenter": {
-                            "name": latest_quake.earthquake.hypocenter.name if hasattr(latest_quake, 'earthquake') and latest_quake.earthquake.hypocenter else None,
-                            "magnitude": latest_quake.earthquake.hypocenter.magnitude if hasattr(latest_quake, 'earthquake') and latest_quake.earthquake.hypocenter else None,
-                        } if hasattr(latest_quake, 'earthquake') and latest_quake.earthquake.hypocenter else None
-                    }
-                }
-        
-        # If no detailed earthquake data, return default stations
-        default_stations = [
-            {"id": "1", "name": "北海道", "location": "釧路", "prefecture": "北海道", "intensity": 0, "latitude": 42.9849, "longitude": 144.3819},
-            {"id": "2", "name": "北海道", "location": "苫小牧", "prefecture": "北海道", "intensity": 0, "latitude": 42.6343, "longitude": 141.6059},
-            {"id": "3", "name": "新潟県", "location": "新潟", "prefecture": "新潟県", "intensity": 0, "latitude": 37.9161, "longitude": 139.0364},
-            {"id": "4", "name": "石川県", "location": "正院", "prefecture": "石川県", "intensity": 0, "latitude": 37.4479, "longitude": 137.2778},
-            {"id": "5", "name": "埼玉県", "location": "岩槻", "prefecture": "埼玉県", "intensity": 0, "latitude": 35.9494, "longitude": 139.6946},
-            {"id": "6", "name": "東京都", "location": "新宿", "prefecture": "東京都", "intensity": 0, "latitude": 35.6896, "longitude": 139.6917},
-            {"id": "7", "name": "神奈川県", "location": "相模原", "prefecture": "神奈川県", "intensity": 0, "latitude": 35.5707, "longitude": 139.3683},
-            {"id": "8", "name": "大阪府", "location": "堺", "prefecture": "大阪府", "intensity": 0, "latitude": 34.5733, "longitude": 135.4828},
-            {"id": "9", "name": "宮崎県", "location": "都城", "prefecture": "宮崎県", "intensity": 0, "latitude": 31.7190, "longitude": 131.0619},
-            {"id": "10", "name": "沖縄県", "location": "名護", "prefecture": "沖縄県", "intensity": 0, "latitude": 26.5917, "longitude": 127.9769},
-        ]
-        return {"stations": default_stations, "lastUpdate": datetime.now().isoformat(), "source": "default"}
-        
+        return await _cached_json_response(
+            request, "seismic_stations", 2.0, _build_seismic_stations, etag_source=_seismic_stations_etag
+        )
     except Exception as e:
         logger.error(f"Error fetching seismic station data: {e}")
         # Return default stations on error
-        default_stations = [
-            {"id": "1", "name": "北海道", "location": "釧路", "prefecture": "北海道", "intensity": 0, "latitude": 42.9849, "longitude": 144.3819},
-            {"id": "2", "name": "北海道", "location": "苫小牧", "prefecture": "北海道", "intensity": 0, "latitude": 42.6343, "longitude": 141.6059},
-            {"id": "3", "name": "新潟県", "location": "新潟", "prefecture": "新潟県", "intensity": 0, "latitude": 37.9161, "longitude": 139.0364},
-            {"id": "4", "name": "石川県", "location": "正院", "prefecture": "石川県", "intensity": 0, "latitude": 37.4479, "longitude": 137.2778},
-            {"id": "5", "name": "埼玉県", "location": "岩槻", "prefecture": "埼玉県", "intensity": 0, "latitude": 35.9494, "longitude": 139.6946},
-            {"id": "6", "name": "東京都", "location": "新宿", "prefecture": "東京都", "intensity": 0, "latitude": 35.6896, "longitude": 139.6917},
-            {"id": "7", "name": "神奈川県", "location": "相模原", "prefecture": "神奈川県", "intensity": 0, "latitude": 35.5707, "longitude": 139.3683},
-            {"id": "8", "name": "大阪府", "location": "堺", "prefecture": "大阪府", "intensity": 0, "latitude": 34.5733, "longitude": 135.4828},
-            {"id": "9", "name": "宮崎県", "location": "都城", "prefecture": "宮崎県", "intensity": 0, "latitude": 31.7190, "longitude": 131.0619},
-            {"id": "10", "name": "沖縄県", "location": "名護", "prefecture": "沖縄県", "intensity": 0, "latitude": 26.5917, "longitude": 127.9769},
-        ]
-        return {"stations": default_stations, "lastUpdate": datetime.now().isoformat(), "source": "default", "error": str(e)}
+        return _default_stations_response(error=str(e))
 
-@app.get("/api/seismic/waveform")
-async def get_seismic_waveform_data():
-    """Get real-time seismic waveform data based on recent earthquake activity
-    
-    Returns simulated waveform data for 10 seismic stations across Japan.
-    The waveforms are influenced by recent earthquake events from P2P API.
-    """
-    import math
-    
-    # Define monitoring stations
-    stations = [
-        {"id": "1", "name": "北海道", "location": "釧路支庁釧路", "lat": 42.98, "lng": 144.38},
-        {"id": "2", "name": "北海道", "location": "胆振支庁苫小牧", "lat": 42.63, "lng": 141.60},
-        {"id": "3", "name": "新潟県", "location": "新潟", "lat": 37.90, "lng": 139.02},
-        {"id": "4", "name": "石川県", "location": "正院", "lat": 37.47, "lng": 137.26},
-        {"id": "5", "name": "埼玉県", "location": "岩槻", "lat": 35.94, "lng": 139.69},
-        {"id": "6", "name": "東京都", "location": "新宿", "lat": 35.69, "lng": 139.70},
-        {"id": "7", "name": "神奈川県", "location": "相模原", "lat": 35.55, "lng": 139.37},
-        {"id": "8", "name": "大阪府", "location": "堺", "lat": 34.57, "lng": 135.47},
-        {"id": "9", "name": "宮崎県", "location": "都城", "lat": 31.72, "lng": 131.06},
-        {"id": "10", "name": "沖縄県", "location": "名護", "lat": 26.59, "lng": 127.97},
-    ]
+# Recent earthquakes feeding the waveform simulation, shared for a short window
+_latest_quakes_cache: Dict[str, Any] = {"t": 0.0, "v": [], "lock": asyncio.Lock()}
+
+async def _get_recent_waveform_quakes() -> List[Dict[str, Any]]:
+    """Return hypocenters of the latest P2P earthquakes, refreshed at most every 2s"""
+    if not p2p_earthquake_service:
+        return []
     
-    # Get recent earthquakes to influence waveforms
-    recent_earthquakes = []
-    if p2p_earthquake_service:
-        try:
-            latest_quakes = p2p_earthquake_service.get_latest_earthquakes(5)
-            for quake in latest_quakes:
-                if hasattr(quake, 'earthquake') and quake.earthquake and quake.earthquake.hypocenter:
+    cache = _latest_quakes_cache
+    async with cache["lock"]:
+        now = time.monotonic()
+        if now - cache["t"] > 2.0:
+            recent_earthquakes = []
+            try:
+                for quake in p2p_earthquake_service.get_latest_earthquakes(5):
                     hypo = quake.earthquake.hypocenter
-                    if hypo.latitude and hypo.longitude and hypo.magnitude:
+                    if hypo and hypo.latitude and hypo.longitude and hypo.magnitude:
                         recent_earthquakes.append({
                             "lat": hypo.latitude,
                             "lng": hypo.longitude,
@@ -3785,80 +3868,157 @@ async def get_seismic_waveform_data():
                             "depth": hypo.depth or 10,
                             "time": quake.time
                         })
-        except Exception as e:
-            logger.warning(f"Could not fetch recent earthquakes for waveforms: {e}")
+            except Exception as e:
+                logger.warning(f"Could not fetch recent earthquakes for waveforms: {e}")
+            cache["v"] = recent_earthquakes
+            cache["t"] = now
+        return cache["v"]
+
+async def _simulate_waveforms():
+    """Simulate waveforms for the monitoring stations
+    
+    Returns the response metadata and one row per station. The waveforms are
+    influenced by recent earthquake events from P2P API.
+    """
+    # Get recent earthquakes to influence waveforms
+    recent_earthquakes = await _get_recent_waveform_quakes()
     
-    # Calculate distance between two coordinates (simplified)
-    def calculate_distance(lat1, lng1, lat2, lng2):
-        """Calculate approximate distance in km using simple formula"""
-        lat_diff = (lat2 - lat1) * 111  # 1 degree latitude ≈ 111 km
-        lng_diff = (lng2 - lng1) * 111 * math.cos(math.radians(lat1))
-        return math.sqrt(lat_diff**2 + lng_diff**2)
+    # Calculate influence from recent earthquakes for all stations at once
+    # (approximate planar distance in km: 1 degree latitude ≈ 111 km)
+    if recent_earthquakes:
+        quakes_ll = np.array([(eq["lat"], eq["lng"]) for eq in recent_earthquakes], dtype=np.float64)
+        mags = np.array([eq["magnitude"] for eq in recent_earthquakes], dtype=np.float64)
+        st_ll = _MONITOR_STATIONS_NP
+        lat_diff = (quakes_ll[:, 0][None, :] - st_ll[:, 0][:, None]) * 111.0
+        lng_diff = (quakes_ll[:, 1][None, :] - st_ll[:, 1][:, None]) * 111.0 * np.cos(np.radians(st_ll[:, 0]))[:, None]
+        dist = np.hypot(lat_diff, lng_diff)
+        # Influence decreases with distance, increases with magnitude (capped per earthquake)
+        influence = np.minimum((mags[None, :] / np.maximum(dist, 1.0)) * 5.0, 2.0)
+        earthquake_influences = np.where(dist > 0, influence, 0.0).sum(axis=1)
+    else:
+        earthquake_influences = np.zeros(len(_MONITOR_STATIONS))
     
-    # Generate waveform data for each station
-    station_data = []
+    # Generate 100 data points per station in one batch (50ms intervals)
+    rng = np.random.default_rng()
+    shape = (len(_MONITOR_STATIONS), 100)
     current_time = datetime.now()
+    time_factor = current_time.timestamp() + np.arange(100) * 0.05
     
-    for station in stations:
-        # Base noise level
-        base_amplitude = random.uniform(0.1, 0.3)
-        
-        # Calculate influence from recent earthquakes
-        earthquake_influence = 0.0
-        for eq in recent_earthquakes:
-            distance = calculate_distance(
-                station["lat"], station["lng"],
-                eq["lat"], eq["lng"]
-            )
-            
-            # Calculate influence based on magnitude and distance
-            if distance > 0:
-                # Influence decreases with distance, increases with magnitude
-                influence = (eq["magnitude"] / max(distance, 1)) * 5
-                earthquake_influence += min(influence, 2.0)  # Cap influence
-        
-        # Generate 100 data points for the waveform
-        waveform_data = []
-        for i in range(100):
-            # Base waveform (noise)
-            noise = random.uniform(-base_amplitude, base_amplitude)
-            
-            # Periodic component (simulating natural oscillation)
-            time_factor = (current_time.timestamp() + i * 0.05)  # 50ms intervals
-            periodic = math.sin(time_factor + int(station["id"]) * math.pi / 5) * 0.2
-            
-            # Add earthquake influence
-            eq_wave = earthquake_influence * math.sin(time_factor * 2) * 0.3
-            
-            # Occasional spikes
-            spike = 0
-            if random.random() > 0.97:
-                spike = random.uniform(-0.5, 0.5)
-            
-            # Combine all components
-            value = noise + periodic + eq_wave + spike
-            waveform_data.append(round(value, 4))
-        
-        station_data.append({
+    # Base waveform (noise) scaled by a per-station base noise level
+    base_amplitudes = rng.uniform(0.1, 0.3, shape[0])
+    noise = rng.uniform(-1.0, 1.0, shape) * base_amplitudes[:, None]
+    
+    # Periodic component (simulating natural oscillation)
+    phases = np.array([int(station["id"]) for station in _MONITOR_STATIONS]) * np.pi / 5
+    periodic = np.sin(time_factor[None, :] + phases[:, None]) * 0.2
+    
+    # Add earthquake influence
+    eq_wave = earthquake_influences[:, None] * np.sin(time_factor * 2)[None, :] * 0.3
+    
+    # Occasional spikes
+    spikes = np.where(rng.random(shape) > 0.97, rng.uniform(-0.5, 0.5, shape), 0.0)
+    
+    # Combine all components
+    waveforms = noise + periodic + eq_wave + spikes
+    amplitudes = np.abs(waveforms)
+    
+    station_data = [
+        {
             "id": station["id"],
             "name": station["name"],
             "location": station["location"],
             "latitude": station["lat"],
             "longitude": station["lng"],
-            "waveform": waveform_data,
-            "current_amplitude": round(abs(waveform_data[-1]), 4),
-            "max_amplitude": round(max([abs(x) for x in waveform_data]), 4),
-            "earthquake_influence": round(earthquake_influence, 2)
-        })
+            "waveform": waveforms[idx].tolist(),
+            "current_amplitude": float(amplitudes[idx, -1]),
+            "max_amplitude": float(amplitudes[idx].max()),
+            "earthquake_influence": float(earthquake_influences[idx])
+        }
+        for idx, station in enumerate(_MONITOR_STATIONS)
+    ]
     
-    return {
-        "stations": station_data,
-        "timestamp": current_time.isoformat(),
+    meta = {
+        "timestamp": current_time,
         "recent_earthquakes_count": len(recent_earthquakes),
         "update_interval_ms": 50,
         "data_points_per_station": 100,
         "unit": "gal"
     }
+    return meta, station_data
+
+@app.get("/api/seismic/waveform")
+async def get_seismic_waveform_data():
+    """Get real-time seismic waveform data based on recent earthquake activity
+    
+    Returns simulated waveform data for 10 seismic stations across Japan.
+    The waveforms are influenced by recent earthquake events from P2P API.
+    """
+    meta, station_data = await _simulate_waveforms()
+    # orjson emits shortest round-trip floats, so samples are not rounded by hand
+    return Response(content=orjson.dumps({"stations": station_data, **meta}), media_type="application/json")
+
+@app.get("/api/seismic/waveform/stream")
+async def stream_seismic_waveform_data():
+    """Stream seismic waveform data as NDJSON
+    
+    The first line holds the metadata of /api/seismic/waveform, followed by one
+    line per station so clients can draw each trace as soon as it arrives.
+    """
+    meta, station_data = await _simulate_waveforms()
+    
+    async def generate():
+        yield orjson.dumps(meta) + b"\n"
+        for row in station_data:
+            yield orjson.dumps(row) + b"\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+# Social media request bodies
+class EmergencyAlertRequest(BaseModel):
+    """Emergency alert post request"""
+    disaster_type: str = "unknown"
+    disaster_data: Dict[str, Any] = {}
+    channel_ids: Optional[List[str]] = None
+
+class SituationUpdateRequest(BaseModel):
+    """Situation update post request"""
+    situation_data: Dict[str, Any] = {}
+    channel_ids: Optional[List[str]] = None
+
+class EvacuationOrderRequest(BaseModel):
+    """Evacuation order post request"""
+    evacuation_data: Dict[str, Any] = {}
+    channel_ids: Optional[List[str]] = None
+
+class ScheduleCreateRequest(BaseModel):
+    """Recurring social media job definition"""
+    channel_ids: List[str] = []
+    mode: Literal["self_post", "comment"] = "self_post"
+    post_type: PostType = PostType.SITUATION_UPDATE
+    frequency_minutes: int = 30
+    targets: Optional[List[str]] = None
+    content: Optional[Dict[str, Any]] = None
+    enabled: bool = True
+
+class ScheduleUpdateRequest(BaseModel):
+    """Partial update of a recurring social media job"""
+    channel_ids: Optional[List[str]] = None
+    mode: Optional[Literal["self_post", "comment"]] = None
+    post_type: Optional[PostType] = None
+    frequency_minutes: Optional[int] = None
+    targets: Optional[List[str]] = None
+    content: Optional[Dict[str, Any]] = None
+    enabled: Optional[bool] = None
+    reset_next_run: Optional[bool] = None
+
+    @field_validator("channel_ids", "mode", "post_type", "frequency_minutes", "enabled", "reset_next_run", mode="before")
+    @classmethod
+    def _reject_null(cls, value):
+        # Omit a field to leave it unchanged; only targets/content may be cleared with null
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
 
 # Social Media Automation API Endpoints
 @app.get("/api/social-media/status")
@@ -3892,17 +4052,16 @@ async def get_social_media_history(hours: int = 24):
         raise HTTPException(status_code=500, detail="Failed to get social media history")
 
 @app.post("/api/social-media/emergency-alert")
-async def post_emergency_alert(request: dict):
+async def post_emergency_alert(request: EmergencyAlertRequest):
     """Post emergency alert to all configured social media channels"""
     if not social_media_automation:
         raise HTTPException(status_code=503, detail="Social media automation service not available")
     
     try:
-        disaster_type = request.get('disaster_type', 'unknown')
-        disaster_data = request.get('disaster_data', {})
-        
-        channel_ids = request.get('channel_ids')
-        post_ids = await social_media_automation.post_emergency_alert(disaster_type, disaster_data, channel_ids=channel_ids)
+        disaster_type = request.disaster_type
+        post_ids = await social_media_automation.post_emergency_alert(
+            disaster_type, request.disaster_data, channel_ids=request.channel_ids
+        )
         
         return {
             "success": True,
@@ -3915,16 +4074,15 @@ async def post_emergency_alert(request: dict):
         raise HTTPException(status_code=500, detail="Failed to post emergency alert")
 
 @app.post("/api/social-media/situation-update")
-async def post_situation_update(request: dict):
+async def post_situation_update(request: SituationUpdateRequest):
     """Post situation update to social media channels"""
     if not social_media_automation:
         raise HTTPException(status_code=503, detail="Social media automation service not available")
     
     try:
-        situation_data = request.get('situation_data', {})
-        
-        channel_ids = request.get('channel_ids')
-        post_ids = await social_media_automation.post_situation_update(situation_data, channel_ids=channel_ids)
+        post_ids = await social_media_automation.post_situation_update(
+            request.situation_data, channel_ids=request.channel_ids
+        )
         
         return {
             "success": True,
@@ -3936,16 +4094,15 @@ async def post_situation_update(request: dict):
         raise HTTPException(status_code=500, detail="Failed to post situation update")
 
 @app.post("/api/social-media/evacuation-order")
-async def post_evacuation_order(request: dict):
+async def post_evacuation_order(request: EvacuationOrderRequest):
     """Post evacuation order to social media channels"""
     if not social_media_automation:
         raise HTTPException(status_code=503, detail="Social media automation service not available")
     
     try:
-        evacuation_data = request.get('evacuation_data', {})
-        
-        channel_ids = request.get('channel_ids')
-        post_ids = await social_media_automation.post_evacuation_order(evacuation_data, channel_ids=channel_ids)
+        post_ids = await social_media_automation.post_evacuation_order(
+            request.evacuation_data, channel_ids=request.channel_ids
+        )
         
         return {
             "success": True,
@@ -3963,9 +4120,8 @@ async def get_social_media_channels():
         raise HTTPException(status_code=503, detail="Social media automation service not available")
     
     try:
-        channels = []
-        for channel_id, channel in social_media_automation.channels.items():
-            channels.append({
+        channels = [
+            {
                 "channel_id": channel_id,
                 "channel_name": channel.channel_name,
                 "platform": channel.platform.value,
@@ -3976,7 +4132,9 @@ async def get_social_media_channels():
                 "commenting_frequency": channel.commenting_frequency,
                 "disaster_types": channel.disaster_types,
                 "language": channel.language
-            })
+            }
+            for channel_id, channel in social_media_automation.channels.items()
+        ]
         
         return {
             "channels": channels,
@@ -4019,14 +4177,14 @@ async def list_social_media_schedules():
     if not social_media_automation:
         raise HTTPException(status_code=503, detail="Social media automation service not available")
     try:
-        schedules = await social_media_automation.list_recurring_jobs()
+        schedules = social_media_automation.list_recurring_jobs()
         return {"schedules": schedules, "total": len(schedules)}
     except Exception as e:
         logger.error(f"Error listing schedules: {e}")
         raise HTTPException(status_code=500, detail="Failed to list schedules")
 
 @app.post("/api/social-media/schedules")
-async def create_social_media_schedule(request: dict):
+async def create_social_media_schedule(request: ScheduleCreateRequest):
     """Create a recurring job for automatic posting/commenting
     Body example:
     {
@@ -4042,30 +4200,17 @@ async def create_social_media_schedule(request: dict):
     if not social_media_automation:
         raise HTTPException(status_code=503, detail="Social media automation service not available")
     try:
-        channel_ids = request.get("channel_ids", [])
-        mode = request.get("mode", "self_post")
-        post_type_str = request.get("post_type", "situation_update")
-        frequency_minutes = int(request.get("frequency_minutes", 30))
-        targets = request.get("targets")
-        content = request.get("content")
-        enabled = bool(request.get("enabled", True))
-
-        if not channel_ids:
+        if not request.channel_ids:
             raise HTTPException(status_code=400, detail="channel_ids is required and must be non-empty")
 
-        try:
-            post_type = PostType(post_type_str)
-        except Exception:
-            raise HTTPException(status_code=400, detail="Invalid post_type")
-
-        job_id = await social_media_automation.create_recurring_job(
-            channel_ids=channel_ids,
-            mode=mode,
-            post_type=post_type,
-            frequency_minutes=frequency_minutes,
-            targets=targets,
-            content=content,
-            enabled=enabled
+        job_id = social_media_automation.create_recurring_job(
+            channel_ids=request.channel_ids,
+            mode=request.mode,
+            post_type=request.post_type,
+            frequency_minutes=request.frequency_minutes,
+            targets=request.targets,
+            content=request.content,
+            enabled=request.enabled
         )
         return {"job_id": job_id}
     except HTTPException:
@@ -4075,19 +4220,13 @@ async def create_social_media_schedule(request: dict):
         raise HTTPException(status_code=500, detail="Failed to create schedule")
 
 @app.patch("/api/social-media/schedules/{job_id}")
-async def update_social_media_schedule(job_id: str, request: dict):
+async def update_social_media_schedule(job_id: str, request: ScheduleUpdateRequest):
     """Update an existing schedule"""
     if not social_media_automation:
         raise HTTPException(status_code=503, detail="Social media automation service not available")
     try:
-        updates = dict(request or {})
-        # Accept string post_type
-        if "post_type" in updates:
-            try:
-                updates["post_type"] = PostType(updates["post_type"])
-            except Exception:
-                raise HTTPException(status_code=400, detail="Invalid post_type")
-        ok = await social_media_automation.update_recurring_job(job_id, updates)
+        updates = request.model_dump(exclude_unset=True)
+        ok = social_media_automation.update_recurring_job(job_id, updates)
         if not ok:
             raise HTTPException(status_code=404, detail="Schedule not found")
         return {"updated": True}
@@ -4103,7 +4242,7 @@ async def delete_social_media_schedule(job_id: str):
     if not social_media_automation:
         raise HTTPException(status_code=503, detail="Social media automation service not available")
     try:
-        ok = await social_media_automation.delete_recurring_job(job_id)
+        ok = social_media_automation.delete_recurring_job(job_id)
         if not ok:
             raise HTTPException(status_code=404, detail="Schedule not found")
         return {"deleted": True}
@@ -4120,5 +4259,8 @@ if __name__ == "__main__":
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
+        workers=1 if settings.debug else settings.workers,  # reload only supports a single worker
+        loop="uvloop",
+        http="httptools",
         log_level=settings.log_level.lower()
     ) 
\ No newline at end of file
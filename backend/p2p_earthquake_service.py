@@ -3,19 +3,34 @@
 P2P地震情報 API v2 Service
 Integrates with P2P地震情報 JSON API (v2) and WebSocket API according to specification.yaml
 Provides real-time earthquake, tsunami, and emergency alert information.
+
+When run standalone the service uses uvloop if it is installed (the FastAPI
+app gets it through uvicorn's loop="uvloop"); nothing here depends on it.
 """
 
 import asyncio
-import json
+import hashlib
 import logging
+import re
+import sys
+import time
+from collections import defaultdict, deque
+from itertools import islice
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any, Union
+from typing import List, Dict, Deque, Tuple, Optional, Any, Union, Literal, Annotated
 from enum import Enum
 import aiohttp
+import msgspec
+import orjson
 import websockets
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError, field_validator
 from dataclasses import dataclass
 
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -73,8 +88,7 @@ class BasicData(BaseModel):
     code: int = Field(..., description="情報コード")
     time: str = Field(..., description="受信日時")
     
-    class Config:
-        extra = "ignore"  # Ignore extra fields like _id
+    model_config = ConfigDict(extra="ignore")  # Ignore extra fields like _id
 
 class HypocenterInfo(BaseModel):
     """震源情報"""
@@ -84,6 +98,8 @@ class HypocenterInfo(BaseModel):
     depth: Optional[int] = Field(None, description="深さ(km)")
     magnitude: Optional[float] = Field(None, description="マグニチュード")
 
+    model_config = ConfigDict(frozen=True)  # Immutable once parsed; history entries share these safely
+
 class IssueInfo(BaseModel):
     """発表元情報"""
     source: Optional[str] = Field(None, description="発表元")
@@ -106,12 +122,23 @@ class ObservationPoint(BaseModel):
     isArea: bool = Field(..., description="区域名かどうか")
     scale: int = Field(..., description="震度")
 
+    model_config = ConfigDict(frozen=True)
+
+    @field_validator('pref', 'addr')
+    @classmethod
+    def _intern_name(cls, v: str) -> str:
+        # Station names repeat across every quake in history; share one str object
+        return sys.intern(v)
+
 class Comments(BaseModel):
     """付加文"""
     freeFormComment: str = Field("", description="自由付加文")
 
+    model_config = ConfigDict(frozen=True)
+
 class JMAQuake(BasicData):
     """地震情報 (code: 551)"""
+    code: Literal[551] = Field(..., description="情報コード")
     issue: IssueInfo = Field(..., description="発表元の情報")
     earthquake: EarthquakeInfo = Field(..., description="地震情報")
     points: Optional[List[ObservationPoint]] = Field([], description="震度観測点の情報")
@@ -137,6 +164,7 @@ class TsunamiArea(BaseModel):
 
 class JMATsunami(BasicData):
     """津波予報 (code: 552)"""
+    code: Literal[552] = Field(..., description="情報コード")
     cancelled: bool = Field(..., description="津波予報が解除されたかどうか")
     issue: IssueInfo = Field(..., description="発表元の情報")
     areas: List[TsunamiArea] = Field([], description="津波予報の詳細")
@@ -146,12 +174,16 @@ class AreaPeer(BaseModel):
     id: int = Field(..., description="地域コード")
     peer: int = Field(..., description="ピア数")
 
+    model_config = ConfigDict(frozen=True)
+
 class Areapeers(BasicData):
     """各地域ピア数 (code: 555)"""
+    code: Literal[555] = Field(..., description="情報コード")
     areas: List[AreaPeer] = Field(..., description="ピアの地域分布")
 
 class EEWDetection(BasicData):
     """緊急地震速報 発表検出 (code: 554)"""
+    code: Literal[554] = Field(..., description="情報コード")
     type: str = Field(..., description="検出種類")
 
 class EEWHypocenter(BaseModel):
@@ -185,8 +217,16 @@ class EEWArea(BaseModel):
     kindCode: Optional[str] = Field(None, description="警報コード")
     arrivalTime: Optional[str] = Field(None, description="主要動の到達予測時刻")
 
+    model_config = ConfigDict(frozen=True)
+
+    @field_validator('pref', 'name')
+    @classmethod
+    def _intern_name(cls, v: str) -> str:
+        return sys.intern(v)
+
 class EEW(BasicData):
     """緊急地震速報（警報） (code: 556)"""
+    code: Literal[556] = Field(..., description="情報コード")
     test: Optional[bool] = Field(False, description="テストかどうか")
     earthquake: Optional[EEWEarthquake] = Field(None, description="地震の情報")
     issue: EEWIssue = Field(..., description="発表情報")
@@ -195,6 +235,7 @@ class EEW(BasicData):
 
 class Userquake(BasicData):
     """地震感知情報 (code: 561)"""
+    code: Literal[561] = Field(..., description="情報コード")
     area: int = Field(..., description="地域コード")
 
 class AreaConfidence(BaseModel):
@@ -205,14 +246,47 @@ class AreaConfidence(BaseModel):
 
 class UserquakeEvaluation(BasicData):
     """地震感知情報 解析結果 (code: 9611)"""
+    code: Literal[9611] = Field(..., description="情報コード")
     count: int = Field(..., description="件数")
     confidence: float = Field(..., description="信頼度（0～1）")
     started_at: Optional[str] = Field(None, description="開始日時")
     updated_at: Optional[str] = Field(None, description="更新日時")
     area_confidences: Optional[Dict[str, AreaConfidence]] = Field({}, description="地域ごとの信頼度情報")
 
-# Union type for all P2P earthquake information
-P2PEarthquakeInfo = Union[JMAQuake, JMATsunami, Areapeers, EEWDetection, EEW, Userquake, UserquakeEvaluation]
+# Union type for all P2P earthquake information, discriminated by information code
+P2PEarthquakeInfo = Annotated[
+    Union[JMAQuake, JMATsunami, Areapeers, EEWDetection, EEW, Userquake, UserquakeEvaluation],
+    Field(discriminator='code')
+]
+
+# List validators are built once and reused for every API response
+_QUAKE_LIST_TA = TypeAdapter(List[JMAQuake])
+_TSUNAMI_LIST_TA = TypeAdapter(List[JMATsunami])
+_INFO_TA = TypeAdapter(P2PEarthquakeInfo)
+_INFO_LIST_TA = TypeAdapter(List[P2PEarthquakeInfo])
+
+_CODE_RE = re.compile(rb'"code"\s*:\s*(\d+)')
+
+class EEWDetectionS(msgspec.Struct):
+    code: Literal[554]
+    time: str
+    type: str
+    id: Optional[str] = None
+
+class UserquakeS(msgspec.Struct):
+    code: Literal[561]
+    time: str
+    area: int
+    id: Optional[str] = None
+
+# Small, flat, high-frequency messages are decoded (with type checks) by msgspec,
+# then wrapped in their pydantic model via model_construct
+_MSGSPEC_DECODERS = {
+    InformationCode.EEW_DETECTION.value: (msgspec.json.Decoder(EEWDetectionS), EEWDetection),
+    InformationCode.USER_QUAKE.value: (msgspec.json.Decoder(UserquakeS), Userquake),
+}
+
+_FAST_PARSE_CODES = frozenset(_MSGSPEC_DECODERS)
 
 @dataclass
 class P2PAPIConfig:
@@ -222,6 +296,11 @@ class P2PAPIConfig:
     websocket_reconnect_interval: int = 30
     api_timeout: int = 10
     rate_limit_delay: float = 1.0  # 60 requests/minute = 1 request/second
+    rate_limit_burst: int = 1  # token bucket capacity (requests allowed back-to-back)
+    redis_url: Optional[str] = None  # Enables the shared response cache when set
+    history_cache_ttl: int = 10  # seconds a cached /history response is fresh
+    jma_cache_ttl: int = 30  # seconds a cached /jma/* list is fresh
+    cache_stale_ttl: int = 3600  # seconds a stale response is kept as an upstream-failure fallback
 
 class P2PEarthquakeService:
     """P2P地震情報 API v2 サービス"""
@@ -231,16 +310,28 @@ class P2PEarthquakeService:
         self.base_url = P2P_SANDBOX_BASE_URL if self.config.use_sandbox else P2P_API_BASE_URL
         self.ws_url = P2P_SANDBOX_WS_URL if self.config.use_sandbox else P2P_WS_URL
         self.session: Optional[aiohttp.ClientSession] = None
+        self.redis = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         self.ws_connection: Optional[websockets.WebSocketServerProtocol] = None
         self.is_monitoring = False
-        self.last_request_time = 0.0
+        self._ws_queue: Optional[asyncio.Queue] = None  # Frame queue of the active connection
+        
+        # Token bucket shared by all concurrent API callers
+        self._rate_lock = asyncio.Lock()
+        self._tokens = float(self.config.rate_limit_burst)
+        self._tokens_updated = 0.0
         
         # Data storage
         self.latest_data: Dict[int, Any] = {}  # Store latest data by information code
-        self.data_history: List[P2PEarthquakeInfo] = []
+        self.data_history: Deque[P2PEarthquakeInfo] = deque(maxlen=1000)  # Oldest entries are evicted automatically
+        self._history_by_code: Dict[int, Deque[P2PEarthquakeInfo]] = defaultdict(lambda: deque(maxlen=1000))
+        
+        # Event callbacks, split into (sync, async) at registration
+        self.callbacks: Dict[int, Tuple[List[callable], List[callable]]] = {}
         
-        # Event callbacks
-        self.callbacks: Dict[int, List[callable]] = {}
+        # Callbacks run on a dispatcher task so slow handlers don't stall WebSocket ingestion
+        self._dispatch_queue: asyncio.Queue = asyncio.Queue(maxsize=10000)
+        self._dispatcher_task: Optional[asyncio.Task] = None
         
         logger.info(f"P2P地震情報サービス初期化 - {'サンドボックス' if self.config.use_sandbox else '本番環境'}")
 
@@ -255,14 +346,32 @@ class P2PEarthquakeService:
 
     async def initialize(self):
         """サービス初期化"""
+        self._loop = asyncio.get_running_loop()
+        # Long-lived keep-alive pool so repeated API calls reuse the TLS connection
+        connector = aiohttp.TCPConnector(
+            limit=20,
+            limit_per_host=10,
+            ttl_dns_cache=300,
+            keepalive_timeout=60,
+            enable_cleanup_closed=True
+        )
         self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=self.config.api_timeout)
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.config.api_timeout),
+            json_serialize=lambda obj: orjson.dumps(obj).decode()
         )
+        if self.config.redis_url and self.redis is None:
+            if aioredis is None:
+                logger.warning("redis パッケージが見つかりません - レスポンスキャッシュ無効")
+            else:
+                self.redis = aioredis.from_url(self.config.redis_url)
+                logger.info("P2Pレスポンスキャッシュ (Redis) 有効")
         logger.info("P2P地震情報サービス初期化完了")
 
     async def cleanup(self):
         """リソースクリーンアップ"""
-        self.is_monitoring = False
+        self.stop_websocket_monitoring()
+        self._stop_dispatcher()
         
         if self.ws_connection:
             await self.ws_connection.close()
@@ -271,66 +380,170 @@ class P2PEarthquakeService:
         if self.session:
             await self.session.close()
             self.session = None
+        
+        if self.redis:
+            await self.redis.close()
+            self.redis = None
             
         logger.info("P2P地震情報サービスクリーンアップ完了")
 
     async def _rate_limit(self):
-        """レート制限実装"""
-        current_time = asyncio.get_event_loop().time()
-        time_since_last = current_time - self.last_request_time
-        
-        if time_since_last < self.config.rate_limit_delay:
-            wait_time = self.config.rate_limit_delay - time_since_last
-            await asyncio.sleep(wait_time)
+        """レート制限実装 (トークンバケット)
+
+        A token is refilled every ``rate_limit_delay`` seconds up to
+        ``rate_limit_burst``. Waiters queue on the lock, so concurrent callers
+        are spaced correctly instead of all waking at the same moment.
+        """
+        delay = self.config.rate_limit_delay
+        if delay <= 0:
+            return
         
-        self.last_request_time = asyncio.get_event_loop().time()
+        loop = self._loop or asyncio.get_running_loop()
+        async with self._rate_lock:
+            while True:
+                now = loop.time()
+                self._tokens = min(
+                    float(self.config.rate_limit_burst),
+                    self._tokens + (now - self._tokens_updated) / delay
+                )
+                self._tokens_updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * delay)
 
     def register_callback(self, information_code: int, callback: callable):
         """特定の情報コードに対するコールバック登録"""
         if information_code not in self.callbacks:
-            self.callbacks[information_code] = []
-        self.callbacks[information_code].append(callback)
+            self.callbacks[information_code] = ([], [])
+        sync_callbacks, async_callbacks = self.callbacks[information_code]
+        if asyncio.iscoroutinefunction(callback):
+            async_callbacks.append(callback)
+        else:
+            sync_callbacks.append(callback)
         logger.info(f"コールバック登録: 情報コード {information_code}")
 
     async def _trigger_callbacks(self, data: P2PEarthquakeInfo):
         """コールバック実行"""
-        if data.code in self.callbacks:
-            for callback in self.callbacks[data.code]:
-                try:
-                    if asyncio.iscoroutinefunction(callback):
-                        await callback(data)
-                    else:
-                        callback(data)
-                except Exception as e:
-                    logger.error(f"コールバック実行エラー: {e}")
-
-    def _parse_response_data(self, raw_data: Dict[str, Any]) -> Optional[P2PEarthquakeInfo]:
-        """APIレスポンスデータをパース"""
+        callbacks = self.callbacks.get(data.code)
+        if not callbacks:
+            return
+        
+        sync_callbacks, async_callbacks = callbacks
+        for callback in sync_callbacks:
+            try:
+                callback(data)
+            except Exception as e:
+                logger.error(f"コールバック実行エラー: {e}")
+        
+        if async_callbacks:
+            results = await asyncio.gather(
+                *(callback(data) for callback in async_callbacks),
+                return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.error(f"コールバック実行エラー: {result}")
+
+    def _parse_response_data(self, raw_data: Union[bytes, str, Dict[str, Any]]) -> Optional[P2PEarthquakeInfo]:
+        """APIレスポンスデータをパース
+
+        Raw JSON (bytes/str) is validated directly by pydantic without building an
+        intermediate dict; the model is selected by the ``code`` discriminator.
+        """
         try:
-            code = raw_data.get('code')
+            if isinstance(raw_data, dict):
+                return _INFO_TA.validate_python(raw_data)
             
-            if code == InformationCode.JMA_QUAKE.value:
-                return JMAQuake(**raw_data)
-            elif code == InformationCode.JMA_TSUNAMI.value:
-                return JMATsunami(**raw_data)
-            elif code == InformationCode.AREA_PEERS.value:
-                return Areapeers(**raw_data)
-            elif code == InformationCode.EEW_DETECTION.value:
-                return EEWDetection(**raw_data)
-            elif code == InformationCode.EEW.value:
-                return EEW(**raw_data)
-            elif code == InformationCode.USER_QUAKE.value:
-                return Userquake(**raw_data)
-            elif code == InformationCode.USER_QUAKE_EVALUATION.value:
-                return UserquakeEvaluation(**raw_data)
+            raw = raw_data.encode() if isinstance(raw_data, str) else raw_data
+            match = _CODE_RE.search(raw)
+            if match and int(match.group(1)) in _FAST_PARSE_CODES:
+                return self._fast_parse(int(match.group(1)), raw)
+            return _INFO_TA.validate_json(raw)
+        except ValidationError as e:
+            error = e.errors()[0]
+            if error['type'] == 'union_tag_invalid':
+                logger.warning(f"未知の情報コード: {error['ctx']['tag']}")
             else:
-                logger.warning(f"未知の情報コード: {code}")
-                return None
-                
+                logger.error(f"データパースエラー: {e}")
+            return None
         except Exception as e:
             logger.error(f"データパースエラー: {e}")
             return None
 
+    def _store_data(self, data: P2PEarthquakeInfo):
+        """受信データを最新データ・履歴に保存"""
+        # Update latest data
+        self.latest_data[data.code] = data
+        
+        # Add to history (keeps last 1000 items), both overall and per information code
+        self.data_history.append(data)
+        self._history_by_code[data.code].append(data)
+
+    def _latest_by_code(self, code: int, limit: int) -> List[P2PEarthquakeInfo]:
+        """情報コード別の最新データを古い順で取得"""
+        items = list(islice(reversed(self._history_by_code[code]), limit))
+        items.reverse()
+        return items
+
+    def _fast_parse(self, code: int, raw: bytes) -> P2PEarthquakeInfo:
+        """高頻度メッセージ (554/561) を高速パスで構築
+
+        The message is type-checked by msgspec and wrapped in its pydantic model.
+        """
+        decoder, model = _MSGSPEC_DECODERS[code]
+        try:
+            return model.model_construct(**msgspec.structs.asdict(decoder.decode(raw)))
+        except msgspec.DecodeError:
+            # Let pydantic report why the message is invalid
+            return _INFO_TA.validate_json(raw)
+
+    async def _fetch_body(self, path: str, params: Dict[str, Any], ttl: int, label: str) -> Optional[bytes]:
+        """GET {base_url}{path} の生レスポンスを取得 (Redisキャッシュ対応)
+
+        Fresh cache hits skip the rate limit and the HTTP call entirely; if the
+        upstream request fails, a stale cached body is served instead.
+        """
+        cache_key = None
+        cached = None
+        if self.redis:
+            cache_key = "p2p:" + hashlib.sha1(f"{path}?{sorted(params.items())}".encode()).hexdigest()
+            try:
+                cached = await self.redis.hgetall(cache_key)
+            except Exception as e:
+                logger.warning(f"キャッシュ取得エラー: {e}")
+            if cached and b'body' in cached:
+                try:
+                    cached_at = float(cached.get(b'timestamp'))
+                except (TypeError, ValueError):
+                    cached_at = None  # Partial or legacy entry: treat as a miss
+                if cached_at is not None and time.time() - cached_at < ttl:
+                    return cached[b'body']
+            else:
+                cached = None
+        
+        await self._rate_limit()
+        
+        try:
+            async with self.session.get(f"{self.base_url}{path}", params=params) as response:
+                if response.status == 200:
+                    body = await response.read()
+                    if cache_key:
+                        try:
+                            await self.redis.hset(cache_key, mapping={'timestamp': time.time(), 'body': body})
+                            await self.redis.expire(cache_key, self.config.cache_stale_ttl)
+                        except Exception as e:
+                            logger.warning(f"キャッシュ保存エラー: {e}")
+                    return body
+                logger.error(f"{label}取得失敗: HTTP {response.status}")
+        except Exception as e:
+            logger.error(f"{label}取得エラー: {e}")
+        
+        if cached:
+            logger.warning(f"{label}: キャッシュ済みの古いデータを返却")
+            return cached[b'body']
+        return None
+
     async def get_history(
         self, 
         codes: Optional[List[int]] = None,
@@ -341,8 +554,6 @@ class P2PEarthquakeService:
         if not self.session:
             await self.initialize()
         
-        await self._rate_limit()
-        
         params = {
             'limit': min(max(limit, 1), 100),  # 1-100の範囲
             'offset': max(offset, 0)
@@ -351,27 +562,26 @@ class P2PEarthquakeService:
         if codes:
             params['codes'] = codes
         
-        try:
-            url = f"{self.base_url}/history"
-            async with self.session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    result = []
-                    
-                    for item in data:
-                        parsed = self._parse_response_data(item)
-                        if parsed:
-                            result.append(parsed)
-                    
-                    logger.info(f"履歴データ取得成功: {len(result)}件")
-                    return result
-                else:
-                    logger.error(f"履歴データ取得失敗: HTTP {response.status}")
-                    return []
-                    
-        except Exception as e:
-            logger.error(f"履歴データ取得エラー: {e}")
+        body = await self._fetch_body("/history", params, self.config.history_cache_ttl, "履歴データ")
+        if body is None:
             return []
+        
+        try:
+            result = _INFO_LIST_TA.validate_json(body)
+        except ValidationError:
+            # Mixed feed: skip unknown codes / invalid entries individually
+            result = []
+            try:
+                for item in orjson.loads(body):
+                    parsed = self._parse_response_data(item)
+                    if parsed:
+                        result.append(parsed)
+            except Exception as e:
+                logger.error(f"履歴データ取得エラー: {e}")
+                return []
+        
+        logger.info(f"履歴データ取得成功: {len(result)}件")
+        return result
 
     async def get_jma_quakes(
         self,
@@ -390,8 +600,6 @@ class P2PEarthquakeService:
         if not self.session:
             await self.initialize()
         
-        await self._rate_limit()
-        
         params = {
             'limit': min(max(limit, 1), 100),
             'offset': max(offset, 0),
@@ -414,29 +622,28 @@ class P2PEarthquakeService:
         if max_scale is not None:
             params['max_scale'] = max_scale
         
-        try:
-            url = f"{self.base_url}/jma/quake"
-            async with self.session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    result = []
-                    
-                    for item in data:
-                        try:
-                            quake = JMAQuake(**item)
-                            result.append(quake)
-                        except Exception as e:
-                            logger.error(f"地震情報パースエラー: {e}")
-                    
-                    logger.info(f"JMA地震情報取得成功: {len(result)}件")
-                    return result
-                else:
-                    logger.error(f"JMA地震情報取得失敗: HTTP {response.status}")
-                    return []
-                    
-        except Exception as e:
-            logger.error(f"JMA地震情報取得エラー: {e}")
+        body = await self._fetch_body("/jma/quake", params, self.config.jma_cache_ttl, "JMA地震情報")
+        if body is None:
             return []
+        
+        try:
+            result = _QUAKE_LIST_TA.validate_json(body)
+        except ValidationError as e:
+            # Fall back to per-item validation so one bad entry doesn't drop the page
+            logger.error(f"地震情報パースエラー: {e.error_count()}件")
+            result = []
+            try:
+                for item in orjson.loads(body):
+                    try:
+                        result.append(JMAQuake.model_validate(item))
+                    except ValidationError:
+                        pass
+            except Exception as e:
+                logger.error(f"JMA地震情報取得エラー: {e}")
+                return []
+        
+        logger.info(f"JMA地震情報取得成功: {len(result)}件")
+        return result
 
     async def get_jma_quake_by_id(self, quake_id: str) -> Optional[JMAQuake]:
         """特定の地震情報取得 (GET /jma/quake/{id})"""
@@ -449,8 +656,7 @@ class P2PEarthquakeService:
             url = f"{self.base_url}/jma/quake/{quake_id}"
             async with self.session.get(url) as response:
                 if response.status == 200:
-                    data = await response.json()
-                    return JMAQuake(**data)
+                    return JMAQuake.model_validate_json(await response.read())
                 elif response.status == 404:
                     logger.warning(f"地震情報が見つかりません: {quake_id}")
                     return None
@@ -474,8 +680,6 @@ class P2PEarthquakeService:
         if not self.session:
             await self.initialize()
         
-        await self._rate_limit()
-        
         params = {
             'limit': min(max(limit, 1), 100),
             'offset': max(offset, 0),
@@ -487,29 +691,28 @@ class P2PEarthquakeService:
         if until_date:
             params['until_date'] = until_date
         
-        try:
-            url = f"{self.base_url}/jma/tsunami"
-            async with self.session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    result = []
-                    
-                    for item in data:
-                        try:
-                            tsunami = JMATsunami(**item)
-                            result.append(tsunami)
-                        except Exception as e:
-                            logger.error(f"津波予報パースエラー: {e}")
-                    
-                    logger.info(f"JMA津波予報取得成功: {len(result)}件")
-                    return result
-                else:
-                    logger.error(f"JMA津波予報取得失敗: HTTP {response.status}")
-                    return []
-                    
-        except Exception as e:
-            logger.error(f"JMA津波予報取得エラー: {e}")
+        body = await self._fetch_body("/jma/tsunami", params, self.config.jma_cache_ttl, "JMA津波予報")
+        if body is None:
             return []
+        
+        try:
+            result = _TSUNAMI_LIST_TA.validate_json(body)
+        except ValidationError as e:
+            # Fall back to per-item validation so one bad entry doesn't drop the page
+            logger.error(f"津波予報パースエラー: {e.error_count()}件")
+            result = []
+            try:
+                for item in orjson.loads(body):
+                    try:
+                        result.append(JMATsunami.model_validate(item))
+                    except ValidationError:
+                        pass
+            except Exception as e:
+                logger.error(f"JMA津波予報取得エラー: {e}")
+                return []
+        
+        logger.info(f"JMA津波予報取得成功: {len(result)}件")
+        return result
 
     async def get_jma_tsunami_by_id(self, tsunami_id: str) -> Optional[JMATsunami]:
         """特定の津波予報取得 (GET /jma/tsunami/{id})"""
@@ -522,8 +725,7 @@ class P2PEarthquakeService:
             url = f"{self.base_url}/jma/tsunami/{tsunami_id}"
             async with self.session.get(url) as response:
                 if response.status == 200:
-                    data = await response.json()
-                    return JMATsunami(**data)
+                    return JMATsunami.model_validate_json(await response.read())
                 elif response.status == 404:
                     logger.warning(f"津波予報が見つかりません: {tsunami_id}")
                     return None
@@ -544,38 +746,55 @@ class P2PEarthquakeService:
         self.is_monitoring = True
         logger.info("WebSocket監視開始")
         
+        if self._dispatcher_task is None:
+            self._dispatcher_task = asyncio.create_task(self._dispatch_callbacks())
+        
         while self.is_monitoring:
             try:
-                async with websockets.connect(self.ws_url) as websocket:
+                # Large JMAQuake frames can exceed the 1 MiB default; the feed is
+                # small JSON, so per-message compression isn't worth the CPU
+                async with websockets.connect(
+                    self.ws_url,
+                    max_size=2**22,
+                    compression=None,
+                    ping_interval=20,
+                    ping_timeout=20
+                ) as websocket:
                     self.ws_connection = websocket
                     logger.info(f"WebSocket接続成功: {self.ws_url}")
                     
-                    async for message in websocket:
-                        if not self.is_monitoring:
-                            break
-                            
-                        try:
-                            data = json.loads(message)
-                            parsed = self._parse_response_data(data)
+                    # A reader task buffers frames; each wakeup drains everything
+                    # received so far and parses it as one batch.
+                    queue: asyncio.Queue = asyncio.Queue()
+                    self._ws_queue = queue
+                    reader = asyncio.create_task(self._read_websocket(websocket, queue))
+                    try:
+                        closed = False
+                        while self.is_monitoring and not closed:
+                            batch = [await queue.get()]
+                            while not queue.empty():
+                                batch.append(queue.get_nowait())
+                            if None in batch:
+                                # Connection closed or stop requested; drop anything after it
+                                closed = True
+                                del batch[batch.index(None):]
                             
-                            if parsed:
-                                # Update latest data
-                                self.latest_data[parsed.code] = parsed
-                                
-                                # Add to history (keep last 1000 items)
-                                self.data_history.append(parsed)
-                                if len(self.data_history) > 1000:
-                                    self.data_history = self.data_history[-1000:]
-                                
-                                # Trigger callbacks
-                                await self._trigger_callbacks(parsed)
-                                
-                                logger.info(f"WebSocketデータ受信: コード {parsed.code}, ID {parsed.id}")
-                            
-                        except json.JSONDecodeError as e:
-                            logger.error(f"WebSocketメッセージパースエラー: {e}")
-                        except Exception as e:
-                            logger.error(f"WebSocketメッセージ処理エラー: {e}")
+                            try:
+                                for parsed in self._parse_batch(batch):
+                                    self._store_data(parsed)
+                                    
+                                    # Hand off to the dispatcher; the loop goes straight back to reading
+                                    try:
+                                        self._dispatch_queue.put_nowait(parsed)
+                                    except asyncio.QueueFull:
+                                        logger.error(f"コールバックキュー満杯 - 破棄: コード {parsed.code}, ID {parsed.id}")
+                                    
+                                    logger.info(f"WebSocketデータ受信: コード {parsed.code}, ID {parsed.id}")
+                            except Exception as e:
+                                logger.error(f"WebSocketメッセージ処理エラー: {e}")
+                    finally:
+                        self._ws_queue = None
+                        reader.cancel()
                             
             except websockets.exceptions.ConnectionClosed:
                 logger.warning("WebSocket接続が閉じられました")
@@ -586,36 +805,85 @@ class P2PEarthquakeService:
                 logger.info(f"WebSocket再接続まで {self.config.websocket_reconnect_interval}秒待機")
                 await asyncio.sleep(self.config.websocket_reconnect_interval)
         
+        self._stop_dispatcher()
         logger.info("WebSocket監視終了")
 
+    async def _dispatch_callbacks(self):
+        """受信データのコールバックを受信順に実行"""
+        while True:
+            data = await self._dispatch_queue.get()
+            try:
+                await self._trigger_callbacks(data)
+            except Exception as e:
+                logger.error(f"コールバック実行エラー: {e}")
+            finally:
+                self._dispatch_queue.task_done()
+
+    def _stop_dispatcher(self):
+        """コールバックディスパッチャー停止"""
+        if self._dispatcher_task:
+            self._dispatcher_task.cancel()
+            self._dispatcher_task = None
+
+    async def _read_websocket(self, websocket, queue: asyncio.Queue):
+        """WebSocketフレームをキューへ転送 (切断時は None を送る)"""
+        try:
+            async for message in websocket:
+                queue.put_nowait(message)
+        except websockets.exceptions.ConnectionClosed:
+            logger.warning("WebSocket接続が閉じられました")
+        except Exception as e:
+            logger.error(f"WebSocket受信エラー: {e}")
+        finally:
+            queue.put_nowait(None)
+
+    def _parse_batch(self, messages: List[Union[bytes, str]]) -> List[P2PEarthquakeInfo]:
+        """受信メッセージをまとめてパース (受信順を維持)"""
+        raws = [message.encode() if isinstance(message, str) else message for message in messages]
+        if len(raws) == 1:
+            parsed = self._parse_response_data(raws[0])
+            return [parsed] if parsed else []
+        
+        # Fast-path codes are parsed one by one; the rest are validated in one call
+        results: List[Optional[P2PEarthquakeInfo]] = [None] * len(raws)
+        pending = []
+        for idx, raw in enumerate(raws):
+            match = _CODE_RE.search(raw)
+            if match and int(match.group(1)) in _FAST_PARSE_CODES:
+                results[idx] = self._parse_response_data(raw)
+            else:
+                pending.append(idx)
+        
+        if pending:
+            try:
+                validated = _INFO_LIST_TA.validate_json(b"[" + b",".join(raws[idx] for idx in pending) + b"]")
+                for idx, parsed in zip(pending, validated):
+                    results[idx] = parsed
+            except ValidationError:
+                for idx in pending:
+                    results[idx] = self._parse_response_data(raws[idx])
+        
+        return [parsed for parsed in results if parsed]
+
     def stop_websocket_monitoring(self):
         """WebSocket監視停止"""
         self.is_monitoring = False
+        if self._ws_queue is not None:
+            # Wake the batch loop so it exits without waiting for another frame
+            self._ws_queue.put_nowait(None)
         logger.info("WebSocket監視停止要求")
 
     def get_latest_earthquakes(self, limit: int = 10) -> List[JMAQuake]:
         """最新の地震情報取得"""
-        earthquakes = [
-            data for data in self.data_history 
-            if isinstance(data, JMAQuake)
-        ]
-        return earthquakes[-limit:] if earthquakes else []
+        return self._latest_by_code(InformationCode.JMA_QUAKE.value, limit)
 
     def get_latest_tsunamis(self, limit: int = 10) -> List[JMATsunami]:
         """最新の津波予報取得"""
-        tsunamis = [
-            data for data in self.data_history 
-            if isinstance(data, JMATsunami)
-        ]
-        return tsunamis[-limit:] if tsunamis else []
+        return self._latest_by_code(InformationCode.JMA_TSUNAMI.value, limit)
 
     def get_latest_eew(self, limit: int = 10) -> List[EEW]:
         """最新の緊急地震速報取得"""
-        eews = [
-            data for data in self.data_history 
-            if isinstance(data, EEW)
-        ]
-        return eews[-limit:] if eews else []
+        return self._latest_by_code(InformationCode.EEW.value, limit)
 
     def get_service_status(self) -> Dict[str, Any]:
         """サービス状態取得"""
@@ -627,21 +895,48 @@ class P2PEarthquakeService:
             'ws_url': self.ws_url,
             'latest_data_count': len(self.latest_data),
             'history_count': len(self.data_history),
-            'registered_callbacks': sum(len(callbacks) for callbacks in self.callbacks.values())
+            'registered_callbacks': sum(len(sync) + len(async_) for sync, async_ in self.callbacks.values())
         }
 
 # Utility functions for scale conversion
+_SCALE_STRINGS = {
+    10: "1", 20: "2", 30: "3", 40: "4",
+    45: "5弱", 46: "5弱*", 50: "5強",
+    55: "6弱", 60: "6強", 70: "7"
+}
+# Scale ints are small (10..70), so index a flat tuple instead of hashing
+_SCALE_TABLE = tuple(_SCALE_STRINGS.get(i, "不明") for i in range(max(_SCALE_STRINGS) + 1))
+
 def scale_int_to_string(scale_int: int) -> str:
     """震度整数値を文字列に変換"""
-    scale_map = {
-        10: "1", 20: "2", 30: "3", 40: "4",
-        45: "5弱", 46: "5弱*", 50: "5強",
-        55: "6弱", 60: "6強", 70: "7"
-    }
-    return scale_map.get(scale_int, "不明")
+    if 0 <= scale_int < len(_SCALE_TABLE):
+        return _SCALE_TABLE[scale_int]
+    return "不明"
+
+def scale_ints_to_strings(scale_ints: List[int]) -> List[str]:
+    """震度整数値のリストを一括で文字列に変換"""
+    table = _SCALE_TABLE
+    size = len(table)
+    return [table[s] if 0 <= s < size else "不明" for s in scale_ints]
 
 def parse_p2p_time(time_str: str) -> datetime:
     """P2P地震情報の時刻文字列をdatetimeオブジェクトに変換"""
+    # Fixed layout "2006/01/02 15:04:05[.999]" - slice fields directly, strptime is the slow fallback
+    try:
+        if time_str[4] == '/' and time_str[7] == '/' and time_str[13] == ':' and time_str[16] == ':':
+            microsecond = 0
+            if len(time_str) > 19:
+                if time_str[19] != '.':
+                    raise ValueError(time_str)
+                microsecond = int(time_str[20:26].ljust(6, '0'))
+            return datetime(
+                int(time_str[0:4]), int(time_str[5:7]), int(time_str[8:10]),
+                int(time_str[11:13]), int(time_str[14:16]), int(time_str[17:19]),
+                microsecond
+            )
+    except (ValueError, IndexError):
+        pass
+    
     try:
         # Format: "2006/01/02 15:04:05.999"
         return datetime.strptime(time_str, "%Y/%m/%d %H:%M:%S.%f")
@@ -695,4 +990,9 @@ if __name__ == "__main__":
         level=logging.INFO,
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     )
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(main()) 
\ No newline at end of file
@@ -4,169 +4,355 @@ Setup script for YouTube Live Chat integration with pytchat
 Based on https://brian0111.com/youtube-live-chat-pytchat-python/
 """
 
+import argparse
+import asyncio
+import contextlib
+import functools
+import importlib.metadata
 import os
+import re
 import subprocess
 import sys
+import tempfile
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+CRED_FILE = "august-key-430913-i2-3e7c61487160.json"
+CRED_PATH = Path(CRED_FILE)
+SCOPES = ['https://www.googleapis.com/auth/youtube.force-ssl']
+FROZEN_REQUIREMENTS = Path(__file__).with_name("requirements_pytchat_frozen.txt")
+BACKEND_REQUIREMENTS = Path(__file__).with_name("requirements.txt")
+
+_REQUIRED_PACKAGES = (
+    "pytchat==0.5.5",
+    "google-auth==2.17.3",
+    "google-auth-oauthlib==1.0.0",
+    "google-auth-httplib2==0.1.0",
+    "google-api-python-client==2.100.0",
+)
+
 def install_dependencies():
     """Install required Python packages"""
     print("🔧 Installing required dependencies...")
     
-    required_packages = [
-        "pytchat==0.5.5",
-        "google-auth==2.17.3",
-        "google-auth-oauthlib==1.0.0", 
-        "google-auth-httplib2==0.1.0",
-        "google-api-python-client==2.100.0"
-    ]
+    # Packages already at their pinned version need no pip run at all
+    to_install = _missing_packages(_REQUIRED_PACKAGES)
+    if not to_install:
+        print("✅ All dependencies already installed")
+        return True
     
-    for package in required_packages:
-        print(f"Installing {package}...")
-        try:
-            subprocess.check_call([sys.executable, "-m", "pip", "install", package])
-            print(f"✅ {package} installed successfully")
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Failed to install {package}: {e}")
+    # Pinned pytchat/Google closure; shared dependencies are resolved within the
+    # backend's own pins so installing pytchat never replaces them
+    if FROZEN_REQUIREMENTS.exists():
+        print(f"Installing from {FROZEN_REQUIREMENTS.name}...")
+        with _backend_constraints() as constraints:
+            error = _pip("install", "-r", str(FROZEN_REQUIREMENTS), *constraints)
+        if error is None:
+            check = subprocess.run(
+                [sys.executable, "-m", "pip", "check"],
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+            )
+            if check.returncode == 0:
+                print("✅ All dependencies installed successfully")
+                return True
+            # The frozen set doesn't fit this environment; let the resolver repair it
+            print(f"⚠️ pip check reported dependency conflicts:\n{check.stdout.strip()}")
+        else:
+            print(f"❌ Failed to install from {FROZEN_REQUIREMENTS.name}:\n{error}")
+    
+    # Single pip run: one resolver pass and one round of downloads for everything
+    print(f"Installing {', '.join(to_install)}...")
+    with _backend_constraints() as constraints:
+        error = _pip("install", *to_install, *constraints)
+    if error is None:
+        print("✅ All dependencies installed successfully")
+        return True
+    print(f"❌ Failed to install dependencies:\n{error}")
+    
+    # Check each package concurrently to find the failing one(s). Real installs
+    # into the same environment must not run in parallel, so use --dry-run here.
+    print("Checking packages individually...")
+    installable = []
+    with ThreadPoolExecutor(max_workers=min(8, len(to_install))) as executor:
+        futures = {executor.submit(_pip_dry_run, package): package for package in to_install}
+        for future in as_completed(futures):
+            package = futures[future]
+            error = future.result()
+            if error is None:
+                installable.append(package)
+            else:
+                print(f"❌ Failed to install {package}: {error}")
+    
+    if installable:
+        with _backend_constraints() as constraints:
+            error = _pip("install", *installable, *constraints)
+        if error is not None:
+            print(f"❌ Failed to install dependencies:\n{error}")
             return False
+        print(f"✅ Installed: {', '.join(installable)}")
     
-    return True
+    return len(installable) == len(to_install)
+
+@contextlib.contextmanager
+def _backend_constraints():
+    """Yield pip args that constrain installs to the pins in requirements.txt
+
+    pip constraints can't carry extras, so a stripped copy is written to a
+    temporary file. Yields no args when requirements.txt is missing.
+    """
+    if not BACKEND_REQUIREMENTS.exists():
+        yield []
+        return
+    text = re.sub(r"\[[^\]]*\]", "", BACKEND_REQUIREMENTS.read_text(encoding="utf-8"))
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as f:
+        f.write(text)
+    try:
+        yield ["-c", f.name]
+    finally:
+        os.unlink(f.name)
 
-def check_credentials():
+def _missing_packages(packages):
+    """Return the pinned packages that are not installed at their pinned version"""
+    missing = []
+    for package in packages:
+        name, _, pinned = package.partition("==")
+        try:
+            if importlib.metadata.version(name) == pinned:
+                continue
+        except importlib.metadata.PackageNotFoundError:
+            pass
+        missing.append(package)
+    return missing
+
+def _pip(*args):
+    """Run pip quietly; returns its error output, or None on success
+
+    pip's progress output is discarded instead of being streamed through
+    this process; only stderr is kept, and only shown on failure.
+    """
+    result = subprocess.run(
+        [sys.executable, "-m", "pip", *args, "--quiet", "--no-input"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    if result.returncode == 0:
+        return None
+    return result.stderr.strip() or f"exit code {result.returncode}"
+
+def _pip_dry_run(package):
+    """Resolve a single package without installing it; returns the error output or None"""
+    error = _pip("install", "--dry-run", package)
+    return error.splitlines()[-1] if error else None
+
+def _buffered_output(func):
+    """Collect a step's output lines and write them in one call
+
+    Steps run concurrently, so each one's block is emitted whole instead of
+    interleaving line by line with the others.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        lines = []
+        try:
+            return func(lines, *args, **kwargs)
+        finally:
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
+    return wrapper
+
+@functools.lru_cache(maxsize=1)
+def _creds_stat():
+    """Stat the credentials file once per run (None if it is missing)
+
+    A missing file is cached too, so later steps don't stat it again.
+    """
+    try:
+        return CRED_PATH.stat()
+    except FileNotFoundError:
+        return None
+
+def reset_credentials_cache():
+    """Forget the cached credentials state (e.g. after the key file is added)"""
+    _creds_stat.cache_clear()
+    _load_creds.cache_clear()
+
+@functools.lru_cache(maxsize=1)
+def _load_creds():
+    """Load and parse the service account credentials once per process"""
+    from google.oauth2 import service_account
+    return service_account.Credentials.from_service_account_file(str(CRED_PATH), scopes=SCOPES)
+
+@_buffered_output
+def check_credentials(lines):
     """Check if Google service account credentials exist"""
-    credentials_file = "august-key-430913-i2-3e7c61487160.json"
-    
-    if os.path.exists(credentials_file):
-        print(f"✅ Google service account credentials found: {credentials_file}")
+    if _creds_stat() is not None:
+        lines.append(f"✅ Google service account credentials found: {CRED_FILE}")
         return True
     else:
-        print(f"⚠️ Google service account credentials not found: {credentials_file}")
-        print("Please ensure the credentials file is in the backend directory")
+        lines.append(f"⚠️ Google service account credentials not found: {CRED_FILE}")
+        lines.append("Please ensure the credentials file is in the backend directory")
         return False
 
-def test_pytchat():
+@_buffered_output
+def test_pytchat(lines, quick=False):
     """Test pytchat installation"""
-    print("\n🧪 Testing pytchat installation...")
+    lines.append("\n🧪 Testing pytchat installation...")
     
     try:
         import pytchat
-        print(f"✅ pytchat version {pytchat.__version__} imported successfully")
+        lines.append(f"✅ pytchat version {pytchat.__version__} imported successfully")
+        
+        # Offline check: the API the chat service uses is present
+        if not (callable(getattr(pytchat, "create", None)) and hasattr(pytchat, "CompatibleProcessor")):
+            lines.append("❌ pytchat is missing create() / CompatibleProcessor")
+            return False
+        lines.append("✅ pytchat chat API available")
+        
+        # The live probe opens a stream to YouTube; only run it when asked to
+        if quick or os.getenv("SETUP_FULL_TEST") != "1":
+            lines.append("Skipping live pytchat chat creation (set SETUP_FULL_TEST=1 to run it)")
+            return True
         
         # Test creating a chat object with development mode
-        print("Testing pytchat chat creation...")
+        lines.append("Testing pytchat chat creation...")
         # Note: Using a known public video for testing
         test_video_id = "jfKfPfyJRdk"  # YouTube's "lofi hip hop radio" stream
         
         try:
             chat = pytchat.create(video_id=test_video_id, processor=pytchat.CompatibleProcessor())
-            print("✅ pytchat chat object created successfully")
+            lines.append("✅ pytchat chat object created successfully")
             chat.terminate()
             return True
         except Exception as e:
-            print(f"⚠️ pytchat chat creation test failed: {e}")
-            print("This might be normal if the test video is not live")
+            lines.append(f"⚠️ pytchat chat creation test failed: {e}")
+            lines.append("This might be normal if the test video is not live")
             return True  # Still considered success if import works
             
     except ImportError as e:
-        print(f"❌ Failed to import pytchat: {e}")
+        lines.append(f"❌ Failed to import pytchat: {e}")
         return False
 
-def test_google_apis():
+@_buffered_output
+def test_google_apis(lines, quick=False):
     """Test Google API libraries"""
-    print("\n🧪 Testing Google API libraries...")
+    lines.append("\n🧪 Testing Google API libraries...")
     
     try:
         from google.oauth2 import service_account
         from googleapiclient.discovery import build
-        print("✅ Google API libraries imported successfully")
+        lines.append("✅ Google API libraries imported successfully")
         
         # Test credentials loading if file exists
-        credentials_file = "august-key-430913-i2-3e7c61487160.json"
-        if os.path.exists(credentials_file):
+        if _creds_stat() is not None:
             try:
-                credentials = service_account.Credentials.from_service_account_file(
-                    credentials_file,
-                    scopes=['https://www.googleapis.com/auth/youtube.force-ssl']
-                )
-                print("✅ Service account credentials loaded successfully")
+                credentials = _load_creds()
+                lines.append("✅ Service account credentials loaded successfully")
+                
+                if quick:
+                    lines.append("Skipping YouTube API service creation (--quick)")
+                    return True
                 
                 youtube = build('youtube', 'v3', credentials=credentials)
-                print("✅ YouTube API service created successfully")
+                lines.append("✅ YouTube API service created successfully")
                 return True
                 
             except Exception as e:
-                print(f"⚠️ Error loading credentials: {e}")
+                lines.append(f"⚠️ Error loading credentials: {e}")
                 return False
         else:
-            print("⚠️ Credentials file not found, skipping API test")
+            lines.append("⚠️ Credentials file not found, skipping API test")
             return True
             
     except ImportError as e:
-        print(f"❌ Failed to import Google API libraries: {e}")
+        lines.append(f"❌ Failed to import Google API libraries: {e}")
         return False
 
-def create_config_file():
+# The sample config only depends on the environment at startup, so it is
+# serialized once at import and create_config_file() just writes the bytes.
+_CONFIG = {
+    "openai_api_key": os.getenv('OPENAI_API_KEY', ''),
+    "youtube_api_key": os.getenv('YOUTUBE_API_KEY', ''),
+    "auto_response_enabled": True,
+    "ai_response_enabled": True,
+    "auto_response_cooldown": 30,
+    "max_chat_history": 1000,
+    "sentiment_threshold": 0.7,
+    "ai_model": "gpt-3.5-turbo",
+    "max_tokens": 150,
+    "temperature": 0.7
+}
+if orjson is not None:
+    _CONFIG_BYTES = orjson.dumps(_CONFIG, option=orjson.OPT_INDENT_2)
+else:
+    _CONFIG_BYTES = json.dumps(_CONFIG, indent=2, ensure_ascii=False).encode('utf-8')
+
+@_buffered_output
+def create_config_file(lines):
     """Create a sample configuration file"""
-    print("\n📄 Creating configuration file...")
-    
-    config = {
-        "openai_api_key": os.getenv('OPENAI_API_KEY', ''),
-        "youtube_api_key": os.getenv('YOUTUBE_API_KEY', ''),
-        "auto_response_enabled": True,
-        "ai_response_enabled": True,
-        "auto_response_cooldown": 30,
-        "max_chat_history": 1000,
-        "sentiment_threshold": 0.7,
-        "ai_model": "gpt-3.5-turbo",
-        "max_tokens": 150,
-        "temperature": 0.7
-    }
+    lines.append("\n📄 Creating configuration file...")
     
     config_file = "config.json"
     try:
-        with open(config_file, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=4, ensure_ascii=False)
-        print(f"✅ Configuration file created: {config_file}")
+        Path(config_file).write_bytes(_CONFIG_BYTES)
+        lines.append(f"✅ Configuration file created: {config_file}")
         return True
     except Exception as e:
-        print(f"❌ Failed to create config file: {e}")
+        lines.append(f"❌ Failed to create config file: {e}")
         return False
 
+_USAGE_INSTRUCTIONS = """
+============================================================
+🎉 YouTube Live Chat Integration Setup Complete!
+============================================================
+
+📋 NEXT STEPS:
+
+1. Set your YouTube Live Video ID:
+   - Edit .env file
+   - Change YOUTUBE_LIVE_VIDEO_ID from 'development_mode' to your actual video ID
+   - Example: YOUTUBE_LIVE_VIDEO_ID=dQw4w9WgXcQ
+
+2. Configure API Keys (if not already done):
+   - OPENAI_API_KEY (for AI responses)
+   - YOUTUBE_API_KEY (for YouTube API access)
+
+3. Start the backend server:
+   python main.py
+
+4. Test the integration:
+   - Visit http://localhost:8000/api/chat/live-status
+   - Check http://localhost:8000/api/chat/messages
+   - Monitor http://localhost:8000/api/chat/analytics
+
+🔗 REFERENCE:
+   Tutorial: https://brian0111.com/youtube-live-chat-pytchat-python/
+   pytchat docs: https://github.com/taizan-hokuto/pytchat
+
+💡 DEVELOPMENT MODE:
+   Leave YOUTUBE_LIVE_VIDEO_ID as 'development_mode' to test with mock data
+
+"""
+
 def print_usage_instructions():
     """Print usage instructions"""
-    print("\n" + "="*60)
-    print("🎉 YouTube Live Chat Integration Setup Complete!")
-    print("="*60)
-    print()
-    print("📋 NEXT STEPS:")
-    print()
-    print("1. Set your YouTube Live Video ID:")
-    print("   - Edit .env file")
-    print("   - Change YOUTUBE_LIVE_VIDEO_ID from 'development_mode' to your actual video ID")
-    print("   - Example: YOUTUBE_LIVE_VIDEO_ID=dQw4w9WgXcQ")
-    print()
-    print("2. Configure API Keys (if not already done):")
-    print("   - OPENAI_API_KEY (for AI responses)")
-    print("   - YOUTUBE_API_KEY (for YouTube API access)")
-    print()
-    print("3. Start the backend server:")
-    print("   python main.py")
-    print()
-    print("4. Test the integration:")
-    print("   - Visit http://localhost:8000/api/chat/live-status")
-    print("   - Check http://localhost:8000/api/chat/messages")
-    print("   - Monitor http://localhost:8000/api/chat/analytics")
-    print()
-    print("🔗 REFERENCE:")
-    print("   Tutorial: https://brian0111.com/youtube-live-chat-pytchat-python/")
-    print("   pytchat docs: https://github.com/taizan-hokuto/pytchat")
-    print()
-    print("💡 DEVELOPMENT MODE:")
-    print("   Leave YOUTUBE_LIVE_VIDEO_ID as 'development_mode' to test with mock data")
-    print()
-
-def main():
+    sys.stdout.write(_USAGE_INSTRUCTIONS)
+
+async def main():
+    parser = argparse.ArgumentParser(description="YouTube Live Chat integration setup")
+    parser.add_argument("--skip-tests", action="store_true", help="skip the pytchat / Google API tests")
+    parser.add_argument("--quick", action="store_true", help="skip the network-bound probes in the tests")
+    phase = parser.add_mutually_exclusive_group()
+    phase.add_argument("--install-only", action="store_true", help="only install dependencies")
+    phase.add_argument("--test-only", action="store_true", help="only check credentials and run the tests")
+    phase.add_argument("--config-only", action="store_true", help="only create config.json")
+    args = parser.parse_args()
+    run_all = not (args.install_only or args.test_only or args.config_only)
+    
     print("🚀 YouTube Live Chat Integration Setup")
     print("Based on pytchat library tutorial")
     print("Reference: https://brian0111.com/youtube-live-chat-pytchat-python/")
@@ -175,28 +361,32 @@ def main():
     success = True
     
     # Install dependencies
-    if not install_dependencies():
-        success = False
+    if run_all or args.install_only:
+        if not install_dependencies():
+            success = False
     
-    # Check credentials
-    check_credentials()
+    # Credentials check, tests and config file are independent; run them concurrently
+    tests = []
+    other_steps = []
+    if run_all or args.test_only:
+        other_steps.append(asyncio.to_thread(check_credentials))
+        if not args.skip_tests:
+            tests = [
+                asyncio.to_thread(test_pytchat, quick=args.quick),
+                asyncio.to_thread(test_google_apis, quick=args.quick)
+            ]
+    if run_all or args.config_only:
+        other_steps.append(asyncio.to_thread(create_config_file))
     
-    # Test pytchat
-    if not test_pytchat():
+    results = await asyncio.gather(*tests, *other_steps)
+    if not all(results[:len(tests)]):
         success = False
     
-    # Test Google APIs
-    if not test_google_apis():
-        success = False
-    
-    # Create config file
-    create_config_file()
-    
-    if success:
-        print_usage_instructions()
-    else:
+    if not success:
         print("\n❌ Setup completed with some errors. Please check the output above.")
         print("The system may still work in development mode.")
+    elif run_all:
+        print_usage_instructions()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    asyncio.run(main()) 
\ No newline at end of file
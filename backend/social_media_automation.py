@@ -6,19 +6,27 @@ Handles automatic posting and commenting on multiple social media platforms
 """
 
 import asyncio
+import hashlib
+import heapq
+import itertools
 import logging
-import json
 import random
+import sys
+import time
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Literal
+from typing import Dict, List, Optional, Any, Callable, Literal, Tuple
 from dataclasses import dataclass, field
 import uuid
 import aiohttp
 import os
+from functools import lru_cache
+
+import orjson
 
 from social_media_config import (
     PlatformType, PostType, SocialMediaChannel,
-    load_social_media_config, POST_TEMPLATES, AI_PROMPTS
+    load_social_media_config, compile_template, POST_TEMPLATES, AI_PROMPTS
 )
 
 # Configure logging
@@ -28,7 +36,97 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Upper bound on a single scheduler sleep between heap re-checks
+SCHEDULER_MAX_SLEEP = 60
+
+# Connection pool limits for the shared outbound HTTP session
+HTTP_CONNECTION_LIMIT = int(os.getenv('SOCIAL_HTTP_LIMIT', '200'))
+HTTP_CONNECTION_LIMIT_PER_HOST = int(os.getenv('SOCIAL_HTTP_LIMIT_PER_HOST', '30'))
+
+# Maximum number of channels posted to concurrently during a broadcast
+POST_CONCURRENCY = int(os.getenv('SOCIAL_POST_CONCURRENCY', '10'))
+
+# Emergency alerts go through a bounded queue drained by a fixed worker pool
+POST_QUEUE_SIZE = 1024
+POST_WORKERS = int(os.getenv('SOCIAL_POST_WORKERS', '16'))
+
+# Generated content cache (identical payloads reuse the rendered/AI text)
+CONTENT_CACHE_SIZE = 1024
+CONTENT_CACHE_TTL = 300  # seconds
+
+# Post counters are kept per minute for the last day
+POST_BUCKET_SECONDS = 60
+POST_BUCKET_WINDOW = 86400
+
+def _hash_data(data: Dict) -> str:
+    """Stable digest of a content payload for use in cache keys"""
+    encoded = orjson.dumps(data, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+COMPILED_TEMPLATES: Dict[str, Callable[[Dict], str]] = {
+    key: compile_template(template["template"]) for key, template in POST_TEMPLATES.items()
+}
+COMPILED_PROMPTS: Dict[str, Dict[str, Callable[[Dict], str]]] = {
+    content_type: {language: compile_template(prompt) for language, prompt in prompts.items()}
+    for content_type, prompts in AI_PROMPTS.items()
+}
+
+# Built-in content used when neither AI nor a template produced anything.
+# language -> content type -> disaster type (or "_default") -> renderer
+FALLBACK_TEMPLATES: Dict[str, Dict[str, Dict[str, Callable[[Dict], str]]]] = {
+    "ja": {
+        "emergency_alert": {
+            "earthquake": lambda d: f"🚨 地震発生 🚨\n震源地: {d.get('location', '不明')}\nマグニチュード: {d.get('magnitude', '不明')}\n\n⚠️ 安全な場所に避難してください\n#地震 #緊急",
+            "tsunami": lambda d: f"🌊 津波警報 🌊\n対象地域: {d.get('location', '不明')}\n予想波高: {d.get('wave_height', '不明')}m\n\n🚨 沿岸部の方は高台に避難\n#津波 #警報",
+            "_default": lambda d: f"🚨 災害発生 🚨\n種類: {d.get('type', 'unknown')}\n地域: {d.get('location', '不明')}\n\n⚠️ 安全を確保してください\n#災害 #緊急",
+        },
+        "situation_update": {
+            "_default": lambda d: f"📊 状況更新 📊\n現在の状況: {d.get('current_situation', '確認中')}\n影響範囲: {d.get('affected_areas', '確認中')}\n\n最新情報は公式発表をご確認ください\n#災害情報",
+        },
+        "evacuation_order": {
+            "_default": lambda d: f"🚨 避難指示 🚨\n対象地域: {d.get('area', '不明')}\n避難先: {d.get('destination', '高台')}\n\n📱 避難アプリでルート確認\n📞 家族に連絡\n#避難指示",
+        },
+    },
+    "en": {
+        "emergency_alert": {
+            "earthquake": lambda d: f"🚨 EARTHQUAKE ALERT 🚨\nLocation: {d.get('location', 'Unknown')}\nMagnitude: {d.get('magnitude', 'Unknown')}\n\n⚠️ Seek shelter immediately\n#Earthquake #Emergency",
+            "_default": lambda d: f"🚨 DISASTER ALERT 🚨\nType: {d.get('type', 'unknown')}\nLocation: {d.get('location', 'Unknown')}\n\n⚠️ Ensure your safety\n#Disaster #Emergency",
+        },
+        "situation_update": {
+            "_default": lambda d: f"📊 SITUATION UPDATE 📊\nCurrent situation: {d.get('current_situation', 'Under investigation')}\nAffected areas: {d.get('affected_areas', 'Under investigation')}\n\nPlease check official announcements for latest information\n#DisasterInfo",
+        },
+        "evacuation_order": {
+            "_default": lambda d: f"🚨 EVACUATION ORDER 🚨\nTarget area: {d.get('area', 'Unknown')}\nDestination: {d.get('destination', 'High ground')}\n\n📱 Check evacuation app for routes\n📞 Contact family\n#Evacuation",
+        },
+    },
+}
+_FALLBACK_ALIASES = {
+    "emergency": "emergency_alert",
+    "situation": "situation_update",
+    "evacuation": "evacuation_order",
+}
+
+@lru_cache(maxsize=256)
+def _line_push_body(to: str, text: str) -> bytes:
+    """Encoded LINE push payload; identical broadcasts reuse the same bytes"""
+    payload = {'to': to, 'messages': [{'type': 'text', 'text': text}]}
+    return orjson.dumps(payload)
+
+# Second-resolution timestamp reused across mock post ids within the same second
+_TS_CACHE = {"sec": 0, "str": ""}
+_counter = itertools.count()
+
+def _fast_ts() -> str:
+    """Current local time as %Y%m%d_%H%M%S, formatted at most once per second"""
+    sec = int(time.time())
+    if sec != _TS_CACHE["sec"]:
+        _TS_CACHE.update(sec=sec, str=time.strftime('%Y%m%d_%H%M%S', time.localtime(sec)))
+    return _TS_CACHE["str"]
+
+# slots=True needs Python 3.10+; older interpreters keep a regular __dict__
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_DATACLASS_SLOTS)
 class RecurringJob:
     """In-memory recurring job definition for automatic posting/commenting"""
     id: str
@@ -40,7 +138,23 @@ class RecurringJob:
     content: Dict[str, Any] = field(default_factory=dict)
     enabled: bool = True
     last_run: Optional[datetime] = None
-    next_run: datetime = field(default_factory=lambda: datetime.now())
+    # time.monotonic() deadline; immune to wall-clock adjustments
+    next_run_ts: float = field(default_factory=time.monotonic)
+
+def _serialize_job(job: RecurringJob) -> Dict[str, Any]:
+    """API representation of a recurring job"""
+    return {
+        "id": job.id,
+        "channel_ids": job.channel_ids,
+        "mode": job.mode,
+        "post_type": job.post_type.value,
+        "frequency_minutes": job.frequency_minutes,
+        "targets": job.targets,
+        "content": job.content,
+        "enabled": job.enabled,
+        "last_run": job.last_run.isoformat() if job.last_run else None,
+        "next_run": (datetime.now() + timedelta(seconds=job.next_run_ts - time.monotonic())).isoformat(),
+    }
 
 class SocialMediaAutomation:
     """Main social media automation service"""
@@ -48,11 +162,32 @@ class SocialMediaAutomation:
     def __init__(self):
         self.config = load_social_media_config()
         self.channels: Dict[str, SocialMediaChannel] = {}
+        # Derived lookups over self.channels, rebuilt whenever channels are loaded
+        self._channels_by_platform: Dict[PlatformType, List[SocialMediaChannel]] = {}
+        self._channels_by_disaster_type: Dict[str, List[Tuple[str, SocialMediaChannel]]] = {}
         self.ai_service = None
+        self._ai_async = False
         self.is_running = False
-        self.post_history: List[Dict] = []
+        # Bounded post log; the oldest entries fall off automatically
+        self.post_history: deque = deque(maxlen=1000)
+        # [bucket, count] pairs, oldest first, backing the status counters
+        self._post_buckets: deque = deque()
         self.recurring_jobs: Dict[str, RecurringJob] = {}
         self._scheduler_task: Optional[asyncio.Task] = None
+        # Min-heap of (next_run_ts, job_id); stale entries are skipped lazily
+        self._job_heap: List[Tuple[float, str]] = []
+        self._job_wakeup = asyncio.Event()
+        # Shared HTTP session, created on first use so it binds to the running loop
+        self._http: Optional[aiohttp.ClientSession] = None
+        self._post_semaphore = asyncio.Semaphore(POST_CONCURRENCY)
+        self._post_queue: asyncio.Queue = asyncio.Queue(maxsize=POST_QUEUE_SIZE)
+        self._post_workers: List[asyncio.Task] = []
+        self._content_cache: OrderedDict = OrderedDict()
+        # In-flight AI requests keyed like the content cache, shared by concurrent callers
+        self._ai_inflight: Dict[Tuple[str, str, str], asyncio.Future] = {}
+        # Which generators exist for each content type/language, so misses skip straight to fallback
+        self._has_ai_prompt = {(ct, lang) for ct, langs in AI_PROMPTS.items() for lang in langs}
+        self._has_template = set(COMPILED_TEMPLATES.keys())
         
         # Initialize AI service
         self._init_ai_service()
@@ -66,7 +201,7 @@ class SocialMediaAutomation:
         try:
             self.start_scheduler()
         except Exception as e:
-            logger.warning(f"Failed to start scheduler: {e}")
+            logger.warning("Failed to start scheduler: %s", e)
     
     def _init_ai_service(self):
         """Initialize AI service for content generation"""
@@ -74,8 +209,14 @@ class SocialMediaAutomation:
             import openai
             api_key = os.getenv('OPENAI_API_KEY')
             if api_key:
-                self.ai_service = openai
-                self.ai_service.api_key = api_key
+                try:
+                    from openai import AsyncOpenAI
+                    self.ai_service = AsyncOpenAI(api_key=api_key)
+                    self._ai_async = True
+                except ImportError:
+                    # openai<1.0 only has the module-level sync API
+                    self.ai_service = openai
+                    self.ai_service.api_key = api_key
                 logger.info("✓ AI service initialized for content generation")
             else:
                 logger.warning("⚠️ OpenAI API key not found - AI content generation disabled")
@@ -108,164 +249,215 @@ class SocialMediaAutomation:
                     timezone=config.get('timezone', 'Asia/Tokyo')
                 )
                 self.channels[channel_id] = channel
-                logger.info(f"✓ Loaded channel: {channel.channel_name} ({channel.platform.value})")
+                logger.info("✓ Loaded channel: %s (%s)", channel.channel_name, channel.platform.value)
             except Exception as e:
-                logger.error(f"Error loading channel {channel_id}: {e}")
+                logger.error("Error loading channel %s: %s", channel_id, e)
+        
+        self._build_channel_indices()
+    
+    def _build_channel_indices(self):
+        """Rebuild the per-platform and per-disaster-type channel lookups"""
+        self._channels_by_platform = {}
+        self._channels_by_disaster_type = {}
+        for channel_id, channel in self.channels.items():
+            self._channels_by_platform.setdefault(channel.platform, []).append(channel)
+            for disaster_type in channel.disaster_types:
+                self._channels_by_disaster_type.setdefault(disaster_type, []).append((channel_id, channel))
     
     async def post_emergency_alert(self, disaster_type: str, disaster_data: Dict, channel_ids: Optional[List[str]] = None) -> List[str]:
         """Post emergency alert to all active channels"""
-        post_ids = []
-        
-        for channel_id, channel in self.channels.items():
+        self._ensure_post_workers()
+        loop = asyncio.get_running_loop()
+        futures = []
+        for channel_id, channel in self._channels_by_disaster_type.get(disaster_type, []):
             if not channel.is_active or not channel.auto_posting:
                 continue
-            
-            if disaster_type not in channel.disaster_types:
-                continue
             if channel_ids is not None and channel_id not in channel_ids:
                 continue
-            
-            try:
-                # Generate content
-                content = await self._generate_content(channel, "emergency_alert", disaster_data)
-                
-                # Post to platform
-                post_id = await self._post_to_platform(channel, content, PostType.EMERGENCY_ALERT)
-                if post_id:
-                    post_ids.append(post_id)
-                    self._log_post(channel, content, post_id, "emergency_alert")
-                    logger.info(f"✓ Posted emergency alert to {channel.channel_name}")
-                
-            except Exception as e:
-                logger.error(f"Error posting emergency alert to {channel.channel_name}: {e}")
-        
-        return post_ids
+            future = loop.create_future()
+            # Blocks when the queue is full, pushing back on bursty callers
+            await self._post_queue.put({
+                'channel': channel,
+                'content_type': "emergency_alert",
+                'post_type': PostType.EMERGENCY_ALERT,
+                'data': disaster_data,
+                'future': future
+            })
+            futures.append(future)
+        return await self._gather_posts(futures)
     
     async def post_situation_update(self, situation_data: Dict, channel_ids: Optional[List[str]] = None) -> List[str]:
         """Post situation update to relevant channels"""
-        post_ids = []
-        
-        for channel_id, channel in self.channels.items():
-            if not channel.is_active or not channel.auto_posting:
-                continue
-            if channel_ids is not None and channel_id not in channel_ids:
-                continue
-            
-            try:
-                content = await self._generate_content(channel, "situation_update", situation_data)
-                post_id = await self._post_to_platform(channel, content, PostType.SITUATION_UPDATE)
-                if post_id:
-                    post_ids.append(post_id)
-                    self._log_post(channel, content, post_id, "situation_update")
-                    logger.info(f"✓ Posted situation update to {channel.channel_name}")
-                
-            except Exception as e:
-                logger.error(f"Error posting situation update to {channel.channel_name}: {e}")
-        
-        return post_ids
+        return await self._gather_posts([
+            self._bounded(self._post_one(channel, "situation_update", PostType.SITUATION_UPDATE, situation_data))
+            for channel_id, channel in self.channels.items()
+            if channel.is_active and channel.auto_posting
+            and (channel_ids is None or channel_id in channel_ids)
+        ])
     
     async def post_evacuation_order(self, evacuation_data: Dict, channel_ids: Optional[List[str]] = None) -> List[str]:
         """Post evacuation order to relevant channels"""
-        post_ids = []
+        return await self._gather_posts([
+            self._bounded(self._post_one(channel, "evacuation_order", PostType.EVACUATION_ORDER, evacuation_data))
+            for channel_id, channel in self.channels.items()
+            if channel.is_active and channel.auto_posting
+            and (channel_ids is None or channel_id in channel_ids)
+        ])
+    
+    async def _post_one(self, channel: SocialMediaChannel, content_type: str, post_type: PostType, data: Dict) -> Optional[str]:
+        """Generate and publish one post to a single channel, logging it on success"""
+        label = content_type.replace('_', ' ')
+        try:
+            content = await self._generate_content(channel, content_type, data)
+            post_id = await self._post_to_platform(channel, content, post_type)
+            if post_id:
+                self._log_post(channel, content, post_id, content_type)
+                logger.info("✓ Posted %s to %s", label, channel.channel_name)
+            return post_id
         
-        for channel_id, channel in self.channels.items():
-            if not channel.is_active or not channel.auto_posting:
-                continue
-            if channel_ids is not None and channel_id not in channel_ids:
-                continue
-            
+        except Exception as e:
+            logger.error("Error posting %s to %s: %s", label, channel.channel_name, e)
+            return None
+    
+    def _ensure_post_workers(self):
+        """Start the emergency post worker pool on first use (needs a running loop)"""
+        if self._post_workers and not all(w.done() for w in self._post_workers):
+            return
+        self._post_workers = [asyncio.create_task(self._post_worker()) for _ in range(POST_WORKERS)]
+    
+    async def _post_worker(self):
+        """Consume queued posts and resolve each item's future with its post id"""
+        while True:
+            item = await self._post_queue.get()
+            future = item.pop('future')
             try:
-                content = await self._generate_content(channel, "evacuation_order", evacuation_data)
-                post_id = await self._post_to_platform(channel, content, PostType.EVACUATION_ORDER)
-                if post_id:
-                    post_ids.append(post_id)
-                    self._log_post(channel, content, post_id, "evacuation_order")
-                    logger.info(f"✓ Posted evacuation order to {channel.channel_name}")
-                
+                result = await self._post_one(**item)
+                if not future.done():
+                    future.set_result(result)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
             except Exception as e:
-                logger.error(f"Error posting evacuation order to {channel.channel_name}: {e}")
-        
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self._post_queue.task_done()
+    
+    async def _bounded(self, coro):
+        """Await a coroutine while holding the broadcast concurrency limit"""
+        async with self._post_semaphore:
+            return await coro
+    
+    async def _gather_posts(self, coros: List) -> List[str]:
+        """Await per-channel coroutines or futures concurrently and collect the successful post ids"""
+        results = await asyncio.gather(*coros, return_exceptions=True)
+        post_ids = []
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.error("Error in channel broadcast: %s", result)
+            elif result:
+                post_ids.append(result)
         return post_ids
     
     async def _generate_content(self, channel: SocialMediaChannel, content_type: str, data: Dict) -> str:
+        """Generate content, reusing a recent result for the same type, language and payload"""
+        key = (content_type, channel.language, _hash_data(data))
+        cached = self._content_cache.get(key)
+        if cached and time.time() - cached[0] < CONTENT_CACHE_TTL:
+            self._content_cache.move_to_end(key)
+            return cached[1]
+        
+        content = await self._render_content(channel, content_type, data)
+        self._content_cache[key] = (time.time(), content)
+        self._content_cache.move_to_end(key)
+        if len(self._content_cache) > CONTENT_CACHE_SIZE:
+            self._content_cache.popitem(last=False)
+        return content
+    
+    def clear_content_cache(self):
+        """Drop all cached generated content"""
+        self._content_cache.clear()
+    
+    async def _render_content(self, channel: SocialMediaChannel, content_type: str, data: Dict) -> str:
         """Generate content using AI or templates"""
         
         # Try AI generation first
-        if self.ai_service and channel.language in AI_PROMPTS.get(content_type, {}):
+        if self.ai_service and (content_type, channel.language) in self._has_ai_prompt:
             try:
                 ai_content = await self._generate_ai_content(channel, content_type, data)
                 if ai_content:
                     return ai_content
             except Exception as e:
-                logger.warning(f"AI content generation failed: {e}")
+                logger.warning("AI content generation failed: %s", e)
         
         # Fallback to template
         template_key = f"{content_type}_{channel.language}"
-        template = POST_TEMPLATES.get(template_key)
-        
-        if template:
+        if template_key in self._has_template:
             try:
-                return template["template"].format(**data)
+                return COMPILED_TEMPLATES[template_key](data)
             except KeyError as e:
-                logger.warning(f"Missing template variable {e}")
+                logger.warning("Missing template variable %s", e)
         
         # Final fallback
         return self._generate_fallback_content(content_type, data, channel.language)
     
     async def _generate_ai_content(self, channel: SocialMediaChannel, content_type: str, data: Dict) -> Optional[str]:
         """Generate content using AI"""
-        
+        return await self._generate_ai_content_for_language(channel.language, content_type, data)
+    
+    async def _generate_ai_content_for_language(self, language: str, content_type: str, data: Dict) -> Optional[str]:
+        """Generate AI content for a language; channels broadcasting the same payload share one request"""
         if not self.ai_service:
             return None
         
+        key = (content_type, language, _hash_data(data))
+        request = self._ai_inflight.get(key)
+        if request is None:
+            request = asyncio.ensure_future(self._request_ai_content(language, content_type, data))
+            self._ai_inflight[key] = request
+            request.add_done_callback(lambda _: self._ai_inflight.pop(key, None))
+        # Shield so one caller being cancelled doesn't cancel the shared request
+        return await asyncio.shield(request)
+    
+    async def _request_ai_content(self, language: str, content_type: str, data: Dict) -> Optional[str]:
+        """Issue a single completion request for the prompt of this content type and language"""
         try:
-            prompt_template = AI_PROMPTS.get(content_type, {}).get(channel.language)
+            prompt_template = COMPILED_PROMPTS.get(content_type, {}).get(language)
             if not prompt_template:
                 return None
             
-            prompt = prompt_template.format(**data)
+            prompt = prompt_template(data)
             
-            response = await asyncio.to_thread(
-                self.ai_service.ChatCompletion.create,
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=200,
-                temperature=0.7
-            )
+            if self._ai_async:
+                response = await self.ai_service.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=[{"role": "user", "content": prompt}],
+                    max_tokens=200,
+                    temperature=0.7
+                )
+            else:
+                response = await asyncio.to_thread(
+                    self.ai_service.ChatCompletion.create,
+                    model="gpt-3.5-turbo",
+                    messages=[{"role": "user", "content": prompt}],
+                    max_tokens=200,
+                    temperature=0.7
+                )
             
             return response.choices[0].message.content.strip()
             
         except Exception as e:
-            logger.error(f"AI content generation failed: {e}")
+            logger.error("AI content generation failed: %s", e)
             return None
     
     def _generate_fallback_content(self, content_type: str, data: Dict, language: str) -> str:
         """Generate fallback content when AI and templates fail"""
         
-        if language == "ja":
-            if content_type in ("emergency", "emergency_alert"):
-                disaster_type = data.get('type', 'unknown')
-                if disaster_type == "earthquake":
-                    return f"🚨 地震発生 🚨\n震源地: {data.get('location', '不明')}\nマグニチュード: {data.get('magnitude', '不明')}\n\n⚠️ 安全な場所に避難してください\n#地震 #緊急"
-                elif disaster_type == "tsunami":
-                    return f"🌊 津波警報 🌊\n対象地域: {data.get('location', '不明')}\n予想波高: {data.get('wave_height', '不明')}m\n\n🚨 沿岸部の方は高台に避難\n#津波 #警報"
-                else:
-                    return f"🚨 災害発生 🚨\n種類: {disaster_type}\n地域: {data.get('location', '不明')}\n\n⚠️ 安全を確保してください\n#災害 #緊急"
-            elif content_type in ("situation", "situation_update"):
-                return f"📊 状況更新 📊\n現在の状況: {data.get('current_situation', '確認中')}\n影響範囲: {data.get('affected_areas', '確認中')}\n\n最新情報は公式発表をご確認ください\n#災害情報"
-            elif content_type in ("evacuation", "evacuation_order"):
-                return f"🚨 避難指示 🚨\n対象地域: {data.get('area', '不明')}\n避難先: {data.get('destination', '高台')}\n\n📱 避難アプリでルート確認\n📞 家族に連絡\n#避難指示"
-        else:
-            if content_type in ("emergency", "emergency_alert"):
-                disaster_type = data.get('type', 'unknown')
-                if disaster_type == "earthquake":
-                    return f"🚨 EARTHQUAKE ALERT 🚨\nLocation: {data.get('location', 'Unknown')}\nMagnitude: {data.get('magnitude', 'Unknown')}\n\n⚠️ Seek shelter immediately\n#Earthquake #Emergency"
-                else:
-                    return f"🚨 DISASTER ALERT 🚨\nType: {disaster_type}\nLocation: {data.get('location', 'Unknown')}\n\n⚠️ Ensure your safety\n#Disaster #Emergency"
-            elif content_type in ("situation", "situation_update"):
-                return f"📊 SITUATION UPDATE 📊\nCurrent situation: {data.get('current_situation', 'Under investigation')}\nAffected areas: {data.get('affected_areas', 'Under investigation')}\n\nPlease check official announcements for latest information\n#DisasterInfo"
-            elif content_type in ("evacuation", "evacuation_order"):
-                return f"🚨 EVACUATION ORDER 🚨\nTarget area: {data.get('area', 'Unknown')}\nDestination: {data.get('destination', 'High ground')}\n\n📱 Check evacuation app for routes\n📞 Contact family\n#Evacuation"
+        lang_map = FALLBACK_TEMPLATES.get(language, FALLBACK_TEMPLATES["en"])
+        ct_map = lang_map.get(_FALLBACK_ALIASES.get(content_type, content_type))
+        if ct_map:
+            render = ct_map.get(data.get('type', 'unknown')) or ct_map["_default"]
+            return render(data)
         
         return f"Emergency alert: {data.get('message', 'Please check official sources for information')}"
     
@@ -284,13 +476,25 @@ class SocialMediaAutomation:
             elif channel.platform == PlatformType.TWITTER:
                 return await self._post_to_twitter(channel, content, post_type)
             else:
-                logger.warning(f"Platform {channel.platform.value} not implemented")
+                logger.warning("Platform %s not implemented", channel.platform.value)
                 return None
                 
         except Exception as e:
-            logger.error(f"Error posting to {channel.platform.value}: {e}")
+            logger.error("Error posting to %s: %s", channel.platform.value, e)
             return None
     
+    def _get_http(self) -> aiohttp.ClientSession:
+        """Return the shared keep-alive HTTP session, creating it on first use"""
+        if self._http is None or self._http.closed:
+            connector = aiohttp.TCPConnector(
+                limit=HTTP_CONNECTION_LIMIT,
+                limit_per_host=HTTP_CONNECTION_LIMIT_PER_HOST,
+                ttl_dns_cache=300,
+                keepalive_timeout=75
+            )
+            self._http = aiohttp.ClientSession(connector=connector)
+        return self._http
+
     async def _post_to_line(self, channel: SocialMediaChannel, content: str, post_type: PostType) -> Optional[str]:
         """Post to LINE"""
         try:
@@ -299,29 +503,20 @@ class SocialMediaAutomation:
                 'Content-Type': 'application/json'
             }
             
-            data = {
-                'to': channel.channel_id,
-                'messages': [{
-                    'type': 'text',
-                    'text': content
-                }]
-            }
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    'https://api.line.me/v2/bot/message/push',
-                    headers=headers,
-                    json=data
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return result.get('messageId')
-                    else:
-                        logger.error(f"LINE API error: {response.status}")
-                        return None
-                        
+            async with self._get_http().post(
+                'https://api.line.me/v2/bot/message/push',
+                headers=headers,
+                data=_line_push_body(channel.channel_id, content)
+            ) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    return result.get('messageId')
+                else:
+                    logger.error("LINE API error: %s", response.status)
+                    return None
+                    
         except Exception as e:
-            logger.error(f"Error posting to LINE: {e}")
+            logger.error("Error posting to LINE: %s", e)
             return None
     
     async def _post_to_youtube_live(self, channel: SocialMediaChannel, content: str, post_type: PostType) -> Optional[str]:
@@ -333,50 +528,52 @@ class SocialMediaAutomation:
             
             # YouTube Data API v3 implementation would go here
             # For now, return a mock ID
-            logger.info(f"Would post to YouTube Live: {content[:50]}...")
-            return f"yt_live_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            logger.info("Would post to YouTube Live: %s...", content[:50])
+            return f"yt_live_{_fast_ts()}_{next(_counter)}"
             
         except Exception as e:
-            logger.error(f"Error posting to YouTube Live: {e}")
+            logger.error("Error posting to YouTube Live: %s", e)
             return None
     
     async def _post_to_tiktok(self, channel: SocialMediaChannel, content: str, post_type: PostType) -> Optional[str]:
         """Post to TikTok"""
         try:
             # TikTok API implementation would go here
-            logger.info(f"Would post to TikTok: {content[:50]}...")
-            return f"tiktok_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            logger.info("Would post to TikTok: %s...", content[:50])
+            return f"tiktok_{_fast_ts()}_{next(_counter)}"
             
         except Exception as e:
-            logger.error(f"Error posting to TikTok: {e}")
+            logger.error("Error posting to TikTok: %s", e)
             return None
     
     async def _post_to_yahoo(self, channel: SocialMediaChannel, content: str, post_type: PostType) -> Optional[str]:
         """Post to Yahoo!"""
         try:
             # Yahoo! API implementation would go here
-            logger.info(f"Would post to Yahoo!: {content[:50]}...")
-            return f"yahoo_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            logger.info("Would post to Yahoo!: %s...", content[:50])
+            return f"yahoo_{_fast_ts()}_{next(_counter)}"
             
         except Exception as e:
-            logger.error(f"Error posting to Yahoo!: {e}")
+            logger.error("Error posting to Yahoo!: %s", e)
             return None
     
     async def _post_to_twitter(self, channel: SocialMediaChannel, content: str, post_type: PostType) -> Optional[str]:
         """Post to Twitter/X"""
         try:
             # Twitter API v2 implementation would go here
-            logger.info(f"Would post to Twitter: {content[:50]}...")
-            return f"twitter_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            logger.info("Would post to Twitter: %s...", content[:50])
+            return f"twitter_{_fast_ts()}_{next(_counter)}"
             
         except Exception as e:
-            logger.error(f"Error posting to Twitter: {e}")
+            logger.error("Error posting to Twitter: %s", e)
             return None
     
     def _log_post(self, channel: SocialMediaChannel, content: str, post_id: str, post_type: str):
         """Log a successful post"""
+        now = time.time()
         self.post_history.append({
-            'timestamp': datetime.now().isoformat(),
+            'ts': now,
+            'timestamp': datetime.fromtimestamp(now).isoformat(),
             'channel_id': channel.channel_id,
             'channel_name': channel.channel_name,
             'platform': channel.platform.value,
@@ -384,33 +581,76 @@ class SocialMediaAutomation:
             'post_id': post_id,
             'content_preview': content[:100] + "..." if len(content) > 100 else content
         })
-        
-        # Keep only last 1000 posts in history
-        if len(self.post_history) > 1000:
-            self.post_history = self.post_history[-1000:]
+        self._count_post(now)
+    
+    def _count_post(self, now: float):
+        """Increment the per-minute post counter and drop buckets older than a day"""
+        bucket = int(now // POST_BUCKET_SECONDS)
+        if self._post_buckets and self._post_buckets[-1][0] == bucket:
+            self._post_buckets[-1][1] += 1
+        else:
+            self._post_buckets.append([bucket, 1])
+        self._evict_post_buckets(now)
+
+    def _evict_post_buckets(self, now: float):
+        oldest = int((now - POST_BUCKET_WINDOW) // POST_BUCKET_SECONDS)
+        while self._post_buckets and self._post_buckets[0][0] < oldest:
+            self._post_buckets.popleft()
+
+    def _posts_since(self, cutoff: float) -> int:
+        """Number of posts in buckets starting at or after cutoff"""
+        first = int(cutoff // POST_BUCKET_SECONDS)
+        total = 0
+        for bucket, count in reversed(self._post_buckets):
+            if bucket < first:
+                break
+            total += count
+        return total
     
     async def get_status(self) -> Dict[str, Any]:
         """Get service status"""
+        now = time.time()
+        self._evict_post_buckets(now)
         return {
             'total_channels': len(self.channels),
-            'active_channels': len([c for c in self.channels.values() if c.is_active]),
+            'active_channels': sum(channel.is_active for channel in self.channels.values()),
             'platforms': {
-                platform.value: len([c for c in self.channels.values() if c.platform == platform])
+                platform.value: len(self._channels_by_platform.get(platform, ()))
                 for platform in PlatformType
             },
-            'recent_posts': len([p for p in self.post_history if datetime.fromisoformat(p['timestamp']) > datetime.now() - timedelta(hours=1)]),
-            'total_posts_today': len([p for p in self.post_history if datetime.fromisoformat(p['timestamp']) > datetime.now() - timedelta(days=1)]),
+            'recent_posts': self._posts_since(now - 3600),
+            'total_posts_today': self._posts_since(now - POST_BUCKET_WINDOW),
             'ai_service_available': self.ai_service is not None,
             'recurring_jobs': len([j for j in self.recurring_jobs.values() if j.enabled])
         }
     
     async def get_post_history(self, hours: int = 24) -> List[Dict]:
         """Get post history for the last N hours"""
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-        return [
-            post for post in self.post_history
-            if datetime.fromisoformat(post['timestamp']) > cutoff_time
-        ]
+        cutoff = time.time() - hours * 3600
+        # Entries are appended in time order, so walk back from the newest and stop at the cutoff
+        recent = []
+        for entry in reversed(self.post_history):
+            if entry['ts'] <= cutoff:
+                break
+            recent.append(entry)
+        recent.reverse()
+        return recent
+
+    async def close(self):
+        """Stop the scheduler and workers and release the shared HTTP and AI clients"""
+        self.stop_scheduler()
+        for worker in self._post_workers:
+            worker.cancel()
+        await asyncio.gather(*self._post_workers, return_exceptions=True)
+        self._post_workers = []
+        while not self._post_queue.empty():
+            self._post_queue.get_nowait()['future'].cancel()
+            self._post_queue.task_done()
+        if self._http and not self._http.closed:
+            await self._http.close()
+        self._http = None
+        if self._ai_async:
+            await self.ai_service.close()
 
     # ========== Scheduler and Recurring Jobs ==========
     def start_scheduler(self):
@@ -429,26 +669,44 @@ class SocialMediaAutomation:
             self._scheduler_task = None
 
     async def _scheduler_loop(self):
-        """Periodically execute due recurring jobs"""
+        """Execute recurring jobs as they come due, sleeping until the earliest next_run"""
         try:
             while self.is_running:
-                now = datetime.now()
-                due_jobs = [j for j in self.recurring_jobs.values() if j.enabled and j.next_run <= now]
-                for job in due_jobs:
+                now_ts = time.monotonic()
+                if self._job_heap and self._job_heap[0][0] <= now_ts:
+                    next_run_ts, job_id = heapq.heappop(self._job_heap)
+                    job = self.recurring_jobs.get(job_id)
+                    # Deleted, disabled or rescheduled since this entry was pushed
+                    if not job or not job.enabled or job.next_run_ts != next_run_ts:
+                        continue
                     try:
                         await self._run_recurring_job(job)
-                        job.last_run = now
-                        job.next_run = now + timedelta(minutes=max(1, job.frequency_minutes))
+                        job.last_run = datetime.now()
                     except Exception as e:
-                        logger.error(f"Error running recurring job {job.id}: {e}")
-                        job.next_run = now + timedelta(minutes=max(1, job.frequency_minutes))
-                await asyncio.sleep(30)
+                        logger.error("Error running recurring job %s: %s", job.id, e)
+                    job.next_run_ts = now_ts + max(1, job.frequency_minutes) * 60
+                    heapq.heappush(self._job_heap, (job.next_run_ts, job.id))
+                    continue
+
+                timeout = SCHEDULER_MAX_SLEEP
+                if self._job_heap:
+                    timeout = min(timeout, self._job_heap[0][0] - now_ts)
+                self._job_wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._job_wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
         except asyncio.CancelledError:
             logger.info("Recurring scheduler task cancelled")
 
+    def _schedule_job(self, job: RecurringJob):
+        """Push a job onto the scheduler heap and wake the loop to re-check the head"""
+        heapq.heappush(self._job_heap, (job.next_run_ts, job.id))
+        self._job_wakeup.set()
+
     async def _run_recurring_job(self, job: RecurringJob):
         """Execute a single recurring job across its configured channels"""
-        logger.info(f"Running recurring job {job.id} for channels={job.channel_ids} type={job.post_type.value}")
+        logger.info("Running recurring job %s for channels=%s type=%s", job.id, job.channel_ids, job.post_type.value)
 
         if job.mode == "self_post":
             if job.post_type == PostType.EMERGENCY_ALERT:
@@ -459,27 +717,33 @@ class SocialMediaAutomation:
             elif job.post_type == PostType.EVACUATION_ORDER:
                 await self.post_evacuation_order(job.content, channel_ids=job.channel_ids)
             else:
-                for channel_id in job.channel_ids:
-                    channel = self.channels.get(channel_id)
-                    if not channel:
-                        continue
-                    content = await self._generate_content(channel, job.post_type.value, job.content)
-                    await self._post_to_platform(channel, content, job.post_type)
+                await self._gather_posts([
+                    self._bounded(self._post_generated(channel, job.post_type.value, job.post_type, job.content))
+                    for channel in (self.channels.get(cid) for cid in job.channel_ids) if channel
+                ])
         else:
-            for channel_id in job.channel_ids:
-                channel = self.channels.get(channel_id)
-                if not channel:
-                    continue
-                content = await self._generate_content(channel, job.post_type.value, job.content)
-                await self._comment_on_platform(channel, content, job.targets or [])
+            await self._gather_posts([
+                self._bounded(self._comment_generated(channel, job.post_type.value, job.content, job.targets or []))
+                for channel in (self.channels.get(cid) for cid in job.channel_ids) if channel
+            ])
+
+    async def _post_generated(self, channel: SocialMediaChannel, content_type: str, post_type: PostType, data: Dict) -> Optional[str]:
+        """Generate content for a recurring job and post it without recording history"""
+        content = await self._generate_content(channel, content_type, data)
+        return await self._post_to_platform(channel, content, post_type)
+
+    async def _comment_generated(self, channel: SocialMediaChannel, content_type: str, data: Dict, targets: List[str]) -> Optional[str]:
+        """Generate content for a recurring job and comment it on the given targets"""
+        content = await self._generate_content(channel, content_type, data)
+        return await self._comment_on_platform(channel, content, targets)
 
     async def _comment_on_platform(self, channel: SocialMediaChannel, content: str, targets: List[str]) -> Optional[str]:
         """Post a comment on external targets depending on platform. Returns comment id when available."""
         try:
             if channel.platform == PlatformType.YOUTUBE_LIVE:
                 target_info = targets[0] if targets else "unknown_target"
-                logger.info(f"Would comment to YouTube Live target={target_info}: {content[:60]}...")
-                return f"yt_comment_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                logger.info("Would comment to YouTube Live target=%s: %s...", target_info, content[:60])
+                return f"yt_comment_{_fast_ts()}_{next(_counter)}"
             elif channel.platform == PlatformType.LINE:
                 if not targets:
                     return None
@@ -487,43 +751,35 @@ class SocialMediaAutomation:
                     'Authorization': f'Bearer {channel.access_token}',
                     'Content-Type': 'application/json'
                 }
-                data = {
-                    'to': targets[0],
-                    'messages': [{
-                        'type': 'text',
-                        'text': content
-                    }]
-                }
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(
-                        'https://api.line.me/v2/bot/message/push',
-                        headers=headers,
-                        json=data
-                    ) as response:
-                        if response.status == 200:
-                            result = await response.json()
-                            return result.get('messageId')
-                        else:
-                            logger.error(f"LINE API error (comment): {response.status}")
-                            return None
+                async with self._get_http().post(
+                    'https://api.line.me/v2/bot/message/push',
+                    headers=headers,
+                    data=_line_push_body(targets[0], content)
+                ) as response:
+                    if response.status == 200:
+                        result = await response.json()
+                        return result.get('messageId')
+                    else:
+                        logger.error("LINE API error (comment): %s", response.status)
+                        return None
             elif channel.platform == PlatformType.TIKTOK:
-                logger.info(f"Would comment to TikTok targets={targets}: {content[:60]}...")
-                return f"tiktok_comment_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                logger.info("Would comment to TikTok targets=%s: %s...", targets, content[:60])
+                return f"tiktok_comment_{_fast_ts()}_{next(_counter)}"
             elif channel.platform == PlatformType.YAHOO:
-                logger.info(f"Would comment to Yahoo! targets={targets}: {content[:60]}...")
-                return f"yahoo_comment_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                logger.info("Would comment to Yahoo! targets=%s: %s...", targets, content[:60])
+                return f"yahoo_comment_{_fast_ts()}_{next(_counter)}"
         except Exception as e:
-            logger.error(f"Error commenting on {channel.platform.value}: {e}")
+            logger.error("Error commenting on %s: %s", channel.platform.value, e)
             return None
 
-    async def create_recurring_job(self,
-                                   channel_ids: List[str],
-                                   mode: Literal["self_post", "comment"],
-                                   post_type: PostType,
-                                   frequency_minutes: int,
-                                   targets: Optional[List[str]] = None,
-                                   content: Optional[Dict[str, Any]] = None,
-                                   enabled: bool = True) -> str:
+    def create_recurring_job(self,
+                             channel_ids: List[str],
+                             mode: Literal["self_post", "comment"],
+                             post_type: PostType,
+                             frequency_minutes: int,
+                             targets: Optional[List[str]] = None,
+                             content: Optional[Dict[str, Any]] = None,
+                             enabled: bool = True) -> str:
         job_id = uuid.uuid4().hex[:12]
         job = RecurringJob(
             id=job_id,
@@ -536,26 +792,14 @@ class SocialMediaAutomation:
             enabled=enabled,
         )
         self.recurring_jobs[job_id] = job
-        logger.info(f"✓ Created recurring job {job_id} for channels={channel_ids}")
+        self._schedule_job(job)
+        logger.info("✓ Created recurring job %s for channels=%s", job_id, channel_ids)
         return job_id
 
-    async def list_recurring_jobs(self) -> List[Dict[str, Any]]:
-        def serialize(job: RecurringJob) -> Dict[str, Any]:
-            return {
-                "id": job.id,
-                "channel_ids": job.channel_ids,
-                "mode": job.mode,
-                "post_type": job.post_type.value,
-                "frequency_minutes": job.frequency_minutes,
-                "targets": job.targets,
-                "content": job.content,
-                "enabled": job.enabled,
-                "last_run": job.last_run.isoformat() if job.last_run else None,
-                "next_run": job.next_run.isoformat() if job.next_run else None,
-            }
-        return [serialize(job) for job in self.recurring_jobs.values()]
+    def list_recurring_jobs(self) -> List[Dict[str, Any]]:
+        return [_serialize_job(job) for job in self.recurring_jobs.values()]
 
-    async def update_recurring_job(self, job_id: str, updates: Dict[str, Any]) -> bool:
+    def update_recurring_job(self, job_id: str, updates: Dict[str, Any]) -> bool:
         job = self.recurring_jobs.get(job_id)
         if not job:
             return False
@@ -575,10 +819,12 @@ class SocialMediaAutomation:
         if "enabled" in updates:
             job.enabled = bool(updates["enabled"])
         if updates.get("reset_next_run"):
-            job.next_run = datetime.now()
+            job.next_run_ts = time.monotonic()
+        if job.enabled:
+            self._schedule_job(job)
         return True
 
-    async def delete_recurring_job(self, job_id: str) -> bool:
+    def delete_recurring_job(self, job_id: str) -> bool:
         return self.recurring_jobs.pop(job_id, None) is not None
 
 # Global instance
@@ -6,10 +6,14 @@ Configuration settings for social media automation
 """
 
 import os
-from typing import Dict, List
+import string
+import sys
+from typing import Callable, Dict, List, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+import orjson
+
 class PlatformType(Enum):
     """Supported social media platforms"""
     LINE = "line"
@@ -29,7 +33,10 @@ class PostType(Enum):
     WEATHER_UPDATE = "weather_update"
     GENERAL_INFO = "general_info"
 
-@dataclass
+# slots=True needs Python 3.10+; older interpreters keep a regular __dict__
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_DATACLASS_SLOTS)
 class SocialMediaChannel:
     """Configuration for a social media channel"""
     platform: PlatformType
@@ -223,10 +230,51 @@ DISASTER_CONFIGS = {
     }
 }
 
+def compile_template(template: str) -> Callable[[Dict], str]:
+    """Parse a str.format template once into literal/field segments.
+
+    The returned renderer raises KeyError for missing fields, like str.format,
+    so incomplete payloads still fall through to the fallback content.
+    Templates using format specs, conversions or attribute access are
+    rendered with str.format_map instead.
+    """
+    segments = []
+    for literal, field_name, format_spec, conversion in string.Formatter().parse(template):
+        if field_name is not None and (format_spec or conversion or not field_name.isidentifier()):
+            return template.format_map
+        segments.append((literal, field_name))
+
+    def render(data: Dict) -> str:
+        parts = []
+        for literal, field_name in segments:
+            parts.append(literal)
+            if field_name is not None:
+                parts.append(str(data[field_name]))
+        return "".join(parts)
+
+    return render
+
+_ENV_CHANNELS: Optional[Dict] = None
+_CACHED_CONFIG: Optional[Dict] = None
+
+def load_env_channels() -> Dict:
+    """Channel overrides from SOCIAL_MEDIA_CHANNELS, parsed once per process"""
+    global _ENV_CHANNELS
+    if _ENV_CHANNELS is None:
+        _ENV_CHANNELS = orjson.loads(os.getenv('SOCIAL_MEDIA_CHANNELS', '{}'))
+    return _ENV_CHANNELS
+
 def load_social_media_config():
-    """Load social media configuration from environment or defaults"""
+    """Load social media configuration from environment or defaults.
+
+    The result is built once per process and shared.
+    """
+    global _CACHED_CONFIG
+    if _CACHED_CONFIG is not None:
+        return _CACHED_CONFIG
+    
     config = {
-        "channels": DEFAULT_CHANNELS,
+        "channels": dict(DEFAULT_CHANNELS),
         "templates": POST_TEMPLATES,
         "ai_prompts": AI_PROMPTS,
         "schedules": POSTING_SCHEDULES,
@@ -234,12 +282,11 @@ def load_social_media_config():
     }
     
     # Override with environment variables if available
-    social_media_channels = os.getenv('SOCIAL_MEDIA_CHANNELS')
-    if social_media_channels:
+    if os.getenv('SOCIAL_MEDIA_CHANNELS'):
         try:
-            import json
-            config["channels"].update(json.loads(social_media_channels))
+            config["channels"] = {**DEFAULT_CHANNELS, **load_env_channels()}
         except Exception as e:
             print(f"Error loading social media channels from environment: {e}")
     
+    _CACHED_CONFIG = config
     return config 
\ No newline at end of file
@@ -8,17 +8,20 @@ Supports LINE, YouTube LIVE, TikTok, and Yahoo! with AI-generated content
 
 import os
 import asyncio
+import itertools
 import logging
-import json
 import random
+import sys
+import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Union, Any
+from typing import AsyncIterator, Dict, FrozenSet, List, Optional, Union, Any, Callable, Tuple
 from dataclasses import dataclass, field
+from collections import OrderedDict, defaultdict
 from enum import Enum
 import aiohttp
-import schedule
-import time
-from threading import Thread
+import orjson
+
+from social_media_config import POST_TEMPLATES, compile_template, load_env_channels
 
 # Load environment variables
 try:
@@ -34,6 +37,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Enhanced AI content is reused for identical (template, data) pairs for a short while
+AI_CACHE_TTL = 60  # seconds
+AI_CACHE_SIZE = 256
+
 class PlatformType(Enum):
     """Supported social media platforms"""
     LINE = "line"
@@ -44,6 +51,22 @@ class PlatformType(Enum):
     FACEBOOK = "facebook"
     INSTAGRAM = "instagram"
 
+# AI enhancement prompt, split around the template text so only the data part is formatted per call
+_PROMPT_PREFIX = "Generate a social media post for a disaster information system.\n\nTemplate: "
+_PROMPT_SUFFIX_FMT = (
+    "\nData: {data}\n\n"
+    "Requirements:\n"
+    "- Keep within {max_length} characters\n"
+    "- Use appropriate emojis and formatting\n"
+    "- Make it engaging and informative\n"
+    "- Include relevant hashtags\n"
+    "- Language: {language}\n\n"
+    "Generate the enhanced post:"
+)
+
+# Direct value -> member lookup, avoiding the Enum __call__ path per channel
+_PLATFORM_BY_VALUE: Dict[str, PlatformType] = {p.value: p for p in PlatformType}
+
 class PostType(Enum):
     """Types of social media posts"""
     EMERGENCY_ALERT = "emergency_alert"
@@ -53,7 +76,12 @@ class PostType(Enum):
     WEATHER_UPDATE = "weather_update"
     GENERAL_INFO = "general_info"
 
-@dataclass
+_POST_TYPE_BY_VALUE: Dict[str, PostType] = {p.value: p for p in PostType}
+
+# slots=True needs Python 3.10+; older interpreters keep a regular __dict__
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_DATACLASS_SLOTS)
 class SocialMediaChannel:
     """Configuration for a social media channel"""
     platform: PlatformType
@@ -70,11 +98,11 @@ class SocialMediaChannel:
     commenting_frequency: int = 15  # minutes
     max_posts_per_day: int = 50
     max_comments_per_day: int = 100
-    disaster_types: List[str] = field(default_factory=lambda: ["earthquake", "tsunami", "typhoon"])
+    disaster_types: FrozenSet[str] = field(default_factory=lambda: frozenset(("earthquake", "tsunami", "typhoon")))
     language: str = "ja"
     timezone: str = "Asia/Tokyo"
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class PostTemplate:
     """Template for AI-generated social media posts"""
     id: str
@@ -85,8 +113,16 @@ class PostTemplate:
     max_length: int = 280
     language: str = "ja"
     is_active: bool = True
+    _compiled: Callable[[Dict], str] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._compiled = compile_template(self.template)
+    
+    def render(self, data: Dict) -> str:
+        """Fill the template from data; raises KeyError for missing variables"""
+        return self._compiled(data)
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class ScheduledPost:
     """Scheduled social media post"""
     id: str
@@ -100,16 +136,31 @@ class ScheduledPost:
     max_retries: int = 3
     metadata: Dict = field(default_factory=dict)
 
+
 class SocialMediaAutomationService:
     """Comprehensive social media automation service"""
     
-    def __init__(self):
+    def __init__(self, channels_config: Optional[Dict] = None):
+        # Channel definitions; defaults to the SOCIAL_MEDIA_CHANNELS env parsed by social_media_config
+        self._channels_config = channels_config
         self.channels: Dict[str, SocialMediaChannel] = {}
         self.templates: Dict[str, PostTemplate] = {}
+        # (post_type, disaster_type, language) -> template; disaster_type is "" for non-emergency templates
+        self._templates_by_key: Dict[Tuple[str, str, str], PostTemplate] = {}
         self.scheduled_posts: List[ScheduledPost] = []
+        # Filled as channels are loaded so status reads don't rescan every channel per platform
+        self._channels_by_platform: Dict[PlatformType, List[SocialMediaChannel]] = defaultdict(list)
         self.disaster_data_cache: Dict = {}
         self.ai_service = None
+        self._ai_async = False
+        self._ai_cache: OrderedDict = OrderedDict()  # (template id, data json) -> (time, content)
         self.is_running = False
+        # Shared HTTP session, created on first use inside the running loop
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._tasks: List[asyncio.Task] = []
+        # Mock post IDs: startup epoch plus a sequence, unique and ordered within the process
+        self._boot_ts = int(time.time())
+        self._post_seq = itertools.count()
         
         # Initialize AI service for content generation
         self._init_ai_service()
@@ -117,9 +168,6 @@ class SocialMediaAutomationService:
         # Load channels and templates
         self._load_channels()
         self._load_templates()
-        
-        # Start automation scheduler
-        self._start_scheduler()
     
     def _init_ai_service(self):
         """Initialize AI service for content generation"""
@@ -127,8 +175,13 @@ class SocialMediaAutomationService:
             import openai
             api_key = os.getenv('OPENAI_API_KEY')
             if api_key:
-                self.ai_service = openai
-                self.ai_service.api_key = api_key
+                try:
+                    self.ai_service = openai.AsyncOpenAI(api_key=api_key)
+                    self._ai_async = True
+                except AttributeError:
+                    # openai<1.0 only has the module-level sync API
+                    self.ai_service = openai
+                    self.ai_service.api_key = api_key
                 logger.info("✓ AI service initialized for content generation")
             else:
                 logger.warning("⚠️ OpenAI API key not found - AI content generation disabled")
@@ -137,13 +190,13 @@ class SocialMediaAutomationService:
     
     def _load_channels(self):
         """Load social media channels from configuration"""
-        # Load from environment variables or config file
-        channels_config = os.getenv('SOCIAL_MEDIA_CHANNELS', '{}')
         try:
-            channels_data = json.loads(channels_config)
+            channels_data = self._channels_config
+            if channels_data is None:
+                channels_data = load_env_channels()
             for channel_id, config in channels_data.items():
                 channel = SocialMediaChannel(
-                    platform=PlatformType(config['platform']),
+                    platform=_PLATFORM_BY_VALUE[config['platform']],
                     channel_id=channel_id,
                     channel_name=config.get('channel_name', channel_id),
                     access_token=config['access_token'],
@@ -157,105 +210,124 @@ class SocialMediaAutomationService:
                     commenting_frequency=config.get('commenting_frequency', 15),
                     max_posts_per_day=config.get('max_posts_per_day', 50),
                     max_comments_per_day=config.get('max_comments_per_day', 100),
-                    disaster_types=config.get('disaster_types', ["earthquake", "tsunami", "typhoon"]),
+                    disaster_types=frozenset(config.get('disaster_types', ("earthquake", "tsunami", "typhoon"))),
                     language=config.get('language', 'ja'),
                     timezone=config.get('timezone', 'Asia/Tokyo')
                 )
                 self.channels[channel_id] = channel
-                logger.info(f"✓ Loaded channel: {channel.channel_name} ({channel.platform.value})")
+                self._channels_by_platform[channel.platform].append(channel)
+                logger.info("✓ Loaded channel: %s (%s)", channel.channel_name, channel.platform.value)
         except Exception as e:
-            logger.error(f"Error loading channels: {e}")
+            logger.error("Error loading channels: %s", e)
     
     def _load_templates(self):
         """Load post templates for different platforms and content types"""
-        templates = [
-            # Emergency Alerts
-            PostTemplate(
-                id="emergency_earthquake_ja",
-                platform=PlatformType.LINE,
-                post_type=PostType.EMERGENCY_ALERT,
-                template="🚨 緊急地震速報 🚨\n\n震源地: {location}\nマグニチュード: {magnitude}\n最大震度: {intensity}\n\n⚠️ 安全な場所に避難してください\n📞 緊急時は119番に連絡\n\n#地震 #緊急速報 #避難",
-                variables=["location", "magnitude", "intensity"],
-                max_length=200,
-                language="ja"
-            ),
-            PostTemplate(
-                id="emergency_tsunami_ja",
-                platform=PlatformType.LINE,
-                post_type=PostType.EMERGENCY_ALERT,
-                template="🌊 津波警報発令 🌊\n\n対象地域: {location}\n予想波高: {wave_height}m\n到達予想時刻: {arrival_time}\n\n🚨 沿岸部の方は高台に避難してください\n\n#津波 #警報 #避難",
-                variables=["location", "wave_height", "arrival_time"],
-                max_length=200,
-                language="ja"
+        for template_id, config in POST_TEMPLATES.items():
+            template = PostTemplate(
+                id=template_id,
+                platform=_PLATFORM_BY_VALUE[config['platform']],
+                post_type=_POST_TYPE_BY_VALUE[config['post_type']],
+                template=config['template'],
+                variables=config.get('variables', []),
+                max_length=config.get('max_length', 280),
+                language=config.get('language', 'ja')
             )
-        ]
-        
-        for template in templates:
             self.templates[template.id] = template
+            
+            # IDs follow emergency_<disaster>_<language> for emergency alerts
+            stem = template_id[:-len(template.language) - 1] if template_id.endswith("_" + template.language) else template_id
+            disaster_type = stem[len("emergency_"):] if stem.startswith("emergency_") else ""
+            self._templates_by_key[(template.post_type.value, disaster_type, template.language)] = template
         
-        logger.info(f"✓ Loaded {len(templates)} post templates")
+        logger.info("✓ Loaded %s post templates", len(self.templates))
     
-    def _start_scheduler(self):
-        """Start the automation scheduler"""
+    async def start(self):
+        """Start the automation scheduler; call from inside the running event loop"""
         if self.is_running:
             return
         
         self.is_running = True
         
-        # Start scheduler in background thread
-        def run_scheduler():
-            while self.is_running:
-                schedule.run_pending()
-                time.sleep(1)
-        
-        scheduler_thread = Thread(target=run_scheduler, daemon=True)
-        scheduler_thread.start()
-        
-        # Schedule regular tasks
-        schedule.every(5).minutes.do(self._check_for_disasters)
-        schedule.every(10).minutes.do(self._process_scheduled_posts)
-        schedule.every(15).minutes.do(self._generate_ai_content)
+        # Regular tasks run as event loop tasks rather than from a polling thread
+        self._tasks = [
+            asyncio.create_task(self._periodic(self._check_for_disasters, 300)),
+            asyncio.create_task(self._periodic(self._process_scheduled_posts, 600)),
+            asyncio.create_task(self._periodic(self._generate_ai_content, 900))
+        ]
         
         logger.info("✓ Social media automation scheduler started")
     
+    async def _periodic(self, fn, interval: int):
+        """Run fn every interval seconds while the service is running"""
+        while self.is_running:
+            await asyncio.sleep(interval)
+            try:
+                if asyncio.iscoroutinefunction(fn):
+                    await fn()
+                else:
+                    fn()
+            except Exception as e:
+                logger.error("Error in scheduled task %s: %s", fn.__name__, e)
+    
+    def _emergency_channels(self, disaster_type: str) -> List[SocialMediaChannel]:
+        """Active auto-posting channels subscribed to the disaster type"""
+        return [
+            channel for channel in self.channels.values()
+            if channel.is_active and channel.auto_posting and disaster_type in channel.disaster_types
+        ]
+    
     async def post_emergency_alert(self, disaster_type: str, disaster_data: Dict) -> List[str]:
         """Post emergency alert to all active channels"""
         
-        post_ids = []
+        # Channels are independent, so post to all of them at once
+        results = await asyncio.gather(*(
+            self._fanout_one(channel, disaster_type, disaster_data)
+            for channel in self._emergency_channels(disaster_type)
+        ))
+        return [post_id for post_id in results if post_id]
+    
+    async def iter_emergency_alert(self, disaster_type: str, disaster_data: Dict) -> AsyncIterator[str]:
+        """Post emergency alert to all active channels, yielding post IDs as each platform completes"""
         
-        for channel_id, channel in self.channels.items():
-            if not channel.is_active or not channel.auto_posting:
-                continue
+        tasks = [
+            asyncio.create_task(self._fanout_one(channel, disaster_type, disaster_data))
+            for channel in self._emergency_channels(disaster_type)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                post_id = await next_done
+                if post_id:
+                    yield post_id
+        finally:
+            # The consumer stopped early or was cancelled; don't leave posts running
+            for task in tasks:
+                task.cancel()
+    
+    async def _fanout_one(self, channel: SocialMediaChannel, disaster_type: str, disaster_data: Dict) -> Optional[str]:
+        """Generate and post an emergency alert to a single channel"""
+        try:
+            # Generate content using AI
+            content = await self._generate_emergency_content(channel, disaster_type, disaster_data)
             
-            if disaster_type not in channel.disaster_types:
-                continue
+            # Post immediately for emergency alerts
+            post_id = await self._post_to_platform(channel, content, PostType.EMERGENCY_ALERT)
+            if post_id:
+                logger.info("✓ Posted emergency alert to %s", channel.channel_name)
+            return post_id
             
-            try:
-                # Generate content using AI
-                content = await self._generate_emergency_content(channel, disaster_type, disaster_data)
-                
-                # Post immediately for emergency alerts
-                post_id = await self._post_to_platform(channel, content, PostType.EMERGENCY_ALERT)
-                if post_id:
-                    post_ids.append(post_id)
-                    logger.info(f"✓ Posted emergency alert to {channel.channel_name}")
-                
-            except Exception as e:
-                logger.error(f"Error posting emergency alert to {channel.channel_name}: {e}")
-        
-        return post_ids
+        except Exception as e:
+            logger.error("Error posting emergency alert to %s: %s", channel.channel_name, e)
+            return None
     
     async def _generate_emergency_content(self, channel: SocialMediaChannel, 
                                        disaster_type: str, disaster_data: Dict) -> str:
         """Generate emergency content using AI or templates"""
         
-        # Find appropriate template
-        template_key = f"emergency_{disaster_type}_{channel.language}"
-        template = self.templates.get(template_key)
-        
-        if not template:
-            # Fallback to generic emergency template
-            template = self.templates.get(f"emergency_earthquake_{channel.language}")
+        # Find appropriate template, falling back to the generic earthquake one
+        template = (
+            self._templates_by_key.get(("emergency_alert", disaster_type, channel.language))
+            or self._templates_by_key.get(("emergency_alert", "earthquake", channel.language))
+        )
         
         if template and self.ai_service:
             # Use AI to enhance the template
@@ -263,14 +335,14 @@ class SocialMediaAutomationService:
                 enhanced_content = await self._enhance_content_with_ai(template, disaster_data)
                 return enhanced_content
             except Exception as e:
-                logger.warning(f"AI enhancement failed, using template: {e}")
+                logger.warning("AI enhancement failed, using template: %s", e)
         
         # Use template with disaster data
         if template:
             try:
-                return template.template.format(**disaster_data)
+                return template.render(disaster_data)
             except KeyError as e:
-                logger.warning(f"Missing template variable {e}, using fallback")
+                logger.warning("Missing template variable %s, using fallback", e)
         
         # Fallback content
         return self._generate_fallback_content(disaster_type, disaster_data, channel.language)
@@ -279,39 +351,47 @@ class SocialMediaAutomationService:
         """Enhance content using AI"""
         
         if not self.ai_service:
-            return template.template.format(**data)
+            return template.render(data)
+        
+        payload = orjson.dumps(data, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS).decode()
+        cache_key = (template.id, payload)
+        cached = self._ai_cache.get(cache_key)
+        if cached and time.time() - cached[0] < AI_CACHE_TTL:
+            return cached[1]
         
         try:
-            prompt = f"""
-            Generate a social media post for a disaster information system.
-            
-            Template: {template.template}
-            Data: {json.dumps(data, ensure_ascii=False)}
-            
-            Requirements:
-            - Keep within {template.max_length} characters
-            - Use appropriate emojis and formatting
-            - Make it engaging and informative
-            - Include relevant hashtags
-            - Language: {template.language}
+            prompt = "".join((
+                _PROMPT_PREFIX,
+                template.template,
+                _PROMPT_SUFFIX_FMT.format(data=payload, max_length=template.max_length, language=template.language)
+            ))
             
-            Generate the enhanced post:
-            """
-            
-            response = await asyncio.to_thread(
-                self.ai_service.ChatCompletion.create,
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=200,
-                temperature=0.7
-            )
+            if self._ai_async:
+                response = await self.ai_service.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=[{"role": "user", "content": prompt}],
+                    max_tokens=200,
+                    temperature=0.7
+                )
+            else:
+                response = await asyncio.to_thread(
+                    self.ai_service.ChatCompletion.create,
+                    model="gpt-3.5-turbo",
+                    messages=[{"role": "user", "content": prompt}],
+                    max_tokens=200,
+                    temperature=0.7
+                )
             
             enhanced_content = response.choices[0].message.content.strip()
+            self._ai_cache[cache_key] = (time.time(), enhanced_content)
+            self._ai_cache.move_to_end(cache_key)
+            if len(self._ai_cache) > AI_CACHE_SIZE:
+                self._ai_cache.popitem(last=False)
             return enhanced_content
             
         except Exception as e:
-            logger.error(f"AI enhancement failed: {e}")
-            return template.template.format(**data)
+            logger.error("AI enhancement failed: %s", e)
+            return template.render(data)
     
     def _generate_fallback_content(self, disaster_type: str, data: Dict, language: str) -> str:
         """Generate fallback content when AI and templates fail"""
@@ -343,13 +423,27 @@ class SocialMediaAutomationService:
             elif channel.platform == PlatformType.YAHOO:
                 return await self._post_to_yahoo(channel, content, post_type)
             else:
-                logger.warning(f"Platform {channel.platform.value} not implemented")
+                logger.warning("Platform %s not implemented", channel.platform.value)
                 return None
                 
         except Exception as e:
-            logger.error(f"Error posting to {channel.platform.value}: {e}")
+            logger.error("Error posting to %s: %s", channel.platform.value, e)
             return None
     
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled keep-alive HTTP session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=64,
+                    limit_per_host=16,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=75
+                ),
+                timeout=aiohttp.ClientTimeout(total=10)
+            )
+        return self._session
+    
     async def _post_to_line(self, channel: SocialMediaChannel, content: str, post_type: PostType) -> Optional[str]:
         """Post to LINE"""
         try:
@@ -367,21 +461,21 @@ class SocialMediaAutomationService:
                 }]
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    'https://api.line.me/v2/bot/message/push',
-                    headers=headers,
-                    json=data
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return result.get('messageId')
-                    else:
-                        logger.error(f"LINE API error: {response.status}")
-                        return None
-                        
+            session = await self._get_session()
+            async with session.post(
+                'https://api.line.me/v2/bot/message/push',
+                headers=headers,
+                json=data
+            ) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    return result.get('messageId')
+                else:
+                    logger.error("LINE API error: %s", response.status)
+                    return None
+                    
         except Exception as e:
-            logger.error(f"Error posting to LINE: {e}")
+            logger.error("Error posting to LINE: %s", e)
             return None
     
     async def _post_to_youtube_live(self, channel: SocialMediaChannel, content: str, post_type: PostType) -> Optional[str]:
@@ -394,11 +488,11 @@ class SocialMediaAutomationService:
             
             # This would require YouTube Data API v3 setup
             # For now, return a mock ID
-            logger.info(f"Would post to YouTube Live: {content[:50]}...")
-            return f"yt_live_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            logger.info("Would post to YouTube Live: %s...", content[:50])
+            return f"yt_live_{self._boot_ts}_{next(self._post_seq)}"
             
         except Exception as e:
-            logger.error(f"Error posting to YouTube Live: {e}")
+            logger.error("Error posting to YouTube Live: %s", e)
             return None
     
     async def _post_to_tiktok(self, channel: SocialMediaChannel, content: str, post_type: PostType) -> Optional[str]:
@@ -406,11 +500,11 @@ class SocialMediaAutomationService:
         try:
             # TikTok API implementation would go here
             # For now, return a mock ID
-            logger.info(f"Would post to TikTok: {content[:50]}...")
-            return f"tiktok_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            logger.info("Would post to TikTok: %s...", content[:50])
+            return f"tiktok_{self._boot_ts}_{next(self._post_seq)}"
             
         except Exception as e:
-            logger.error(f"Error posting to TikTok: {e}")
+            logger.error("Error posting to TikTok: %s", e)
             return None
     
     async def _post_to_yahoo(self, channel: SocialMediaChannel, content: str, post_type: PostType) -> Optional[str]:
@@ -418,11 +512,11 @@ class SocialMediaAutomationService:
         try:
             # Yahoo! API implementation would go here
             # For now, return a mock ID
-            logger.info(f"Would post to Yahoo!: {content[:50]}...")
-            return f"yahoo_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            logger.info("Would post to Yahoo!: %s...", content[:50])
+            return f"yahoo_{self._boot_ts}_{next(self._post_seq)}"
             
         except Exception as e:
-            logger.error(f"Error posting to Yahoo!: {e}")
+            logger.error("Error posting to Yahoo!: %s", e)
             return None
     
     async def get_channel_status(self) -> Dict[str, Any]:
@@ -436,7 +530,7 @@ class SocialMediaAutomationService:
         }
         
         for platform in PlatformType:
-            platform_channels = [c for c in self.channels.values() if c.platform == platform]
+            platform_channels = self._channels_by_platform.get(platform, [])
             status['platforms'][platform.value] = {
                 'total': len(platform_channels),
                 'active': len([c for c in platform_channels if c.is_active])
@@ -455,17 +549,30 @@ class SocialMediaAutomationService:
                 disaster_data
             )
     
-    def _check_for_disasters(self):
+    async def close(self):
+        """Stop scheduled tasks and release the shared HTTP and AI clients"""
+        self.is_running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self._ai_async:
+            await self.ai_service.close()
+    
+    async def _check_for_disasters(self):
         """Check for new disasters and schedule posts"""
         # This would integrate with your disaster data sources
         pass
     
-    def _process_scheduled_posts(self):
+    async def _process_scheduled_posts(self):
         """Process scheduled posts"""
         # Implementation for processing scheduled posts
         pass
     
-    def _generate_ai_content(self):
+    async def _generate_ai_content(self):
         """Generate AI content for scheduled posts"""
         # Implementation for AI content generation
         pass
@@ -477,4 +584,5 @@ async def init_social_media_service():
     """Initialize the social media automation service"""
     global social_media_service
     social_media_service = SocialMediaAutomationService()
+    await social_media_service.start()
     return social_media_service 
\ No newline at end of file
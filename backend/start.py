@@ -7,15 +7,17 @@ This script imports only essential modules to avoid dependency issues.
 import asyncio
 import logging
 import os
-from contextlib import asynccontextmanager
+from collections import deque
+from contextlib import asynccontextmanager, suppress
 from datetime import datetime
-from typing import List, Optional
-import json
+from functools import lru_cache
+from typing import List, Optional, Set
 
+import orjson
 import uvicorn
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings
 
@@ -79,8 +81,63 @@ logger.info(f"OPENAI_API_KEY: {'SET' if settings.openai_api_key else 'NOT SET'}"
 logger.info(f"SERPAPI_API_KEY: {'SET' if settings.serpapi_api_key else 'NOT SET'}")
 logger.info("================================================")
 
+
+class _WebSocketClient:
+    """Outbound buffer for one websocket, drained by a single writer task.
+
+    Messages are appended to a deque and the writer is woken through a
+    one-shot future, which avoids asyncio.Queue's per-item wakeups.
+    """
+
+    __slots__ = ("websocket", "closed", "_pending", "_waiter", "_writer")
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.closed = False
+        self._pending: deque = deque()
+        self._waiter: Optional[asyncio.Future] = None
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def send(self, message: str) -> None:
+        """Queue an already-encoded message for delivery; dropped once the writer has stopped"""
+        if self.closed:
+            return
+        self._pending.append(message)
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    async def _write_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                if not self._pending:
+                    self._waiter = loop.create_future()
+                    await self._waiter
+                    self._waiter = None
+                while self._pending:
+                    await self.websocket.send_text(self._pending.popleft())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("WebSocket send failed, closing connection: %s", e)
+            # Nothing drains the buffer any more, so stop accepting messages and
+            # close the socket so the receive loop sees the disconnect
+            self.closed = True
+            self._pending.clear()
+            connected_websockets.discard(self)
+            with suppress(Exception):
+                await self.websocket.close()
+
+    async def close(self) -> None:
+        self.closed = True
+        self._writer.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._writer
+
+
 # Global variables
-connected_websockets: List[WebSocket] = []
+connected_websockets: Set[_WebSocketClient] = set()
 chat_messages: List[dict] = []
 
 
@@ -114,6 +171,108 @@ class AutoResponse(BaseModel):
     last_used_at: str
 
 
+# Static mock payloads, serialized once at import
+_STARTED_AT = datetime.now().isoformat()
+
+_MOCK_MESSAGES = [
+    {
+        "id": "msg_001",
+        "message_id": "msg_001",
+        "author": "TestUser1",
+        "message": "Hello! Thank you for the disaster information",
+        "timestamp": _STARTED_AT,
+        "sentiment_score": 0.8,
+        "category": "general",
+        "platform": "youtube"
+    },
+    {
+        "id": "msg_002",
+        "message_id": "msg_002",
+        "author": "DisasterWatcher",
+        "message": "Please tell me about earthquake preparedness",
+        "timestamp": _STARTED_AT,
+        "sentiment_score": 0.1,
+        "category": "disaster",
+        "platform": "youtube"
+    }
+]
+
+_CACHED_ANALYTICS_JSON: bytes = orjson.dumps(ChatAnalytics(
+    total_messages=142,
+    disaster_mentions=23,
+    product_mentions=18,
+    sentiment_score=0.6,
+    top_keywords=["地震", "防災", "津波", "備え", "安全"],
+    active_users=47
+).model_dump())
+
+_CACHED_RESPONSES_JSON: bytes = orjson.dumps([
+    AutoResponse(
+        id=1,
+        trigger_keywords="地震,earthquake",
+        response_text="🚨 地震情報を確認中です。最新情報は画面左上の地震情報パネルをご覧ください。",
+        response_type="disaster",
+        used_count=15,
+        last_used_at=_STARTED_AT
+    ).model_dump(),
+    AutoResponse(
+        id=2,
+        trigger_keywords="防災グッズ,disaster kit",
+        response_text="🎒 おすすめの防災グッズ情報はこちら: https://example.com/disaster-kit",
+        response_type="product",
+        used_count=8,
+        last_used_at=_STARTED_AT
+    ).model_dump()
+])
+
+_CACHED_EARTHQUAKES_JSON: bytes = orjson.dumps([
+    {
+        "id": "mock_eq_1",
+        "time": _STARTED_AT,
+        "location": "東京湾",
+        "magnitude": 4.5,
+        "depth": 80,
+        "latitude": 35.6762,
+        "longitude": 139.6503,
+        "intensity": "4",
+        "tsunami": False
+    },
+    {
+        "id": "mock_eq_2",
+        "time": _STARTED_AT,
+        "location": "千葉県東方沖",
+        "magnitude": 5.2,
+        "depth": 50,
+        "latitude": 35.7601,
+        "longitude": 140.4097,
+        "intensity": "5-",
+        "tsunami": False
+    }
+])
+
+_CACHED_TSUNAMIS_JSON: bytes = orjson.dumps([
+    {
+        "id": "mock_tsunami_1",
+        "location": "宮城県沿岸",
+        "level": "warning",
+        "time": _STARTED_AT,
+        "latitude": 38.2682,
+        "longitude": 140.8694
+    }
+])
+
+
+@lru_cache(maxsize=64)
+def _cached_messages_json(limit: int) -> bytes:
+    """Serialized mock chat messages, cached per limit"""
+    return orjson.dumps(_MOCK_MESSAGES[:limit])
+
+
+def _json_bytes(content: bytes) -> Response:
+    """Wrap pre-serialized JSON without re-encoding it"""
+    return Response(content=content, media_type="application/json")
+
+
 # Lifespan context manager
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -128,7 +287,8 @@ app = FastAPI(
     title="Disaster Information System API",
     description="Backend API for real-time disaster information and monitoring",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -152,28 +312,29 @@ app.add_middleware(
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time updates"""
     await websocket.accept()
-    connected_websockets.append(websocket)
+    client = _WebSocketClient(websocket)
+    connected_websockets.add(client)
     logger.info(f"WebSocket client connected. Total connections: {len(connected_websockets)}")
     
     try:
         # Send initial connection confirmation
-        await websocket.send_json({
+        client.send(orjson.dumps({
             "type": "connection_established",
             "message": "Connected to disaster information system",
             "timestamp": datetime.now().isoformat()
-        })
+        }).decode())
         
         # Listen for incoming messages
         while True:
             try:
                 data = await websocket.receive_text()
-                message = json.loads(data)
+                message = orjson.loads(data)
                 
                 if message.get("type") == "ping":
-                    await websocket.send_json({
+                    client.send(orjson.dumps({
                         "type": "pong",
                         "timestamp": datetime.now().isoformat()
-                    })
+                    }).decode())
                 
             except WebSocketDisconnect:
                 break
@@ -186,8 +347,8 @@ async def websocket_endpoint(websocket: WebSocket):
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
     finally:
-        if websocket in connected_websockets:
-            connected_websockets.remove(websocket)
+        connected_websockets.discard(client)
+        await client.close()
         logger.info(f"WebSocket connection cleaned up. Remaining connections: {len(connected_websockets)}")
 
 
@@ -216,42 +377,13 @@ async def health_check():
 @app.get("/api/chat/messages")
 async def get_chat_messages(limit: int = 50):
     """Get recent chat messages"""
-    mock_messages = [
-        {
-            "id": "msg_001",
-            "message_id": "msg_001",
-            "author": "TestUser1",
-            "message": "Hello! Thank you for the disaster information",
-            "timestamp": datetime.now().isoformat(),
-            "sentiment_score": 0.8,
-            "category": "general",
-            "platform": "youtube"
-        },
-        {
-            "id": "msg_002", 
-            "message_id": "msg_002",
-            "author": "DisasterWatcher",
-            "message": "Please tell me about earthquake preparedness",
-            "timestamp": datetime.now().isoformat(),
-            "sentiment_score": 0.1,
-            "category": "disaster",
-            "platform": "youtube"
-        }
-    ]
-    return mock_messages[:limit]
+    return _json_bytes(_cached_messages_json(limit))
 
 
-@app.get("/api/chat/analytics", response_model=ChatAnalytics)
+@app.get("/api/chat/analytics")
 async def get_chat_analytics():
     """Get chat analytics"""
-    return ChatAnalytics(
-        total_messages=142,
-        disaster_mentions=23,
-        product_mentions=18,
-        sentiment_score=0.6,
-        top_keywords=["地震", "防災", "津波", "備え", "安全"],
-        active_users=47
-    )
+    return _json_bytes(_CACHED_ANALYTICS_JSON)
 
 
 @app.post("/api/chat/response")
@@ -264,75 +396,22 @@ async def send_chat_response(request: dict):
     return {"status": "success", "message": "Response sent (development mode)"}
 
 
-@app.get("/api/chat/responses", response_model=List[AutoResponse])
+@app.get("/api/chat/responses")
 async def get_auto_responses():
     """Get configured auto-responses"""
-    mock_responses = [
-        AutoResponse(
-            id=1,
-            trigger_keywords="地震,earthquake", 
-            response_text="🚨 地震情報を確認中です。最新情報は画面左上の地震情報パネルをご覧ください。",
-            response_type="disaster",
-            used_count=15,
-            last_used_at=datetime.now().isoformat()
-        ),
-        AutoResponse(
-            id=2,
-            trigger_keywords="防災グッズ,disaster kit",
-            response_text="🎒 おすすめの防災グッズ情報はこちら: https://example.com/disaster-kit",
-            response_type="product",
-            used_count=8,
-            last_used_at=datetime.now().isoformat()
-        )
-    ]
-    return mock_responses
+    return _json_bytes(_CACHED_RESPONSES_JSON)
 
 
 @app.get("/api/earthquake/recent")
 async def get_recent_earthquake_data():
     """Get recent earthquake data for map display"""
-    import random
-    mock_earthquakes = [
-        {
-            "id": "mock_eq_1",
-            "time": (datetime.now()).isoformat(),
-            "location": "東京湾",
-            "magnitude": 4.5,
-            "depth": 80,
-            "latitude": 35.6762,
-            "longitude": 139.6503,
-            "intensity": "4",
-            "tsunami": False
-        },
-        {
-            "id": "mock_eq_2", 
-            "time": datetime.now().isoformat(),
-            "location": "千葉県東方沖",
-            "magnitude": 5.2,
-            "depth": 50,
-            "latitude": 35.7601,
-            "longitude": 140.4097,
-            "intensity": "5-",
-            "tsunami": False
-        }
-    ]
-    return mock_earthquakes
+    return _json_bytes(_CACHED_EARTHQUAKES_JSON)
 
 
 @app.get("/api/tsunami/alerts")
 async def get_tsunami_alert_data():
     """Get tsunami alerts for map display"""
-    mock_tsunamis = [
-        {
-            "id": "mock_tsunami_1",
-            "location": "宮城県沿岸",
-            "level": "warning",
-            "time": datetime.now().isoformat(),
-            "latitude": 38.2682,
-            "longitude": 140.8694
-        }
-    ]
-    return mock_tsunamis
+    return _json_bytes(_CACHED_TSUNAMIS_JSON)
 
 
 @app.get("/api/weather/wind")
@@ -375,7 +454,7 @@ async def get_wind_data():
             "humidity": f"{random.randint(40, 80)}%"
         })
     
-    return JSONResponse(content=wind_data, media_type="application/json; charset=utf-8")
+    return wind_data
 
 
 if __name__ == "__main__":
@@ -385,5 +464,8 @@ if __name__ == "__main__":
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
+        loop="uvloop",
+        http="httptools",
+        ws="websockets",
         log_level=settings.log_level.lower()
     ) 
\ No newline at end of file
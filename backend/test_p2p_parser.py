@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for the P2P地震情報 message parser
+Checks that the msgspec fast parse path gives the same models as full
+pydantic validation
+"""
+
+import sys
+import os
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import p2p_earthquake_service as p2p
+from p2p_earthquake_service import (
+    P2PEarthquakeService, InformationCode, EEWDetection, Areapeers, Userquake, JMAQuake
+)
+
+EEW_DETECTION = b'{"code":554,"id":"eew1","time":"2024/01/01 16:10:00.000","type":"Full"}'
+AREA_PEERS = b'{"code":555,"id":"peers1","time":"2024/01/01 16:10:01.000","areas":[{"id":10,"peer":3},{"id":250,"peer":42}]}'
+USER_QUAKE = b'{"code":561,"id":"uq1","time":"2024/01/01 16:10:02.000","area":250}'
+JMA_QUAKE = (
+    '{"code":551,"id":"q1","time":"2024/01/01 16:10:30.000",'
+    '"issue":{"time":"2024/01/01 16:10:00","type":"ScaleAndDestination"},'
+    '"earthquake":{"time":"2024/01/01 16:10:00","hypocenter":{"name":"石川県能登地方","magnitude":7.6},"maxScale":70},'
+    '"points":[{"pref":"石川県","addr":"志賀町","isArea":false,"scale":70}]}'
+).encode()
+
+FAST_MESSAGES = {
+    InformationCode.EEW_DETECTION.value: (EEW_DETECTION, EEWDetection),
+    InformationCode.USER_QUAKE.value: (USER_QUAKE, Userquake),
+}
+
+
+def _assert_matches_full_validation(service, raw, model):
+    parsed = service._parse_response_data(raw)
+    full = p2p._INFO_TA.validate_json(raw)
+    assert type(parsed) is model, (type(parsed), model)
+    assert type(full) is model
+    assert parsed.model_dump() == full.model_dump(), (parsed.model_dump(), full.model_dump())
+
+
+def test_fast_paths_match_full_validation():
+    """554/561 fast paths return the same pydantic models as full validation"""
+    service = P2PEarthquakeService()
+    for code, (raw, model) in FAST_MESSAGES.items():
+        assert code in p2p._FAST_PARSE_CODES
+        _assert_matches_full_validation(service, raw, model)
+    # 555 has no fast path and goes through full validation
+    assert InformationCode.AREA_PEERS.value not in p2p._FAST_PARSE_CODES
+    _assert_matches_full_validation(service, AREA_PEERS, Areapeers)
+    print("✓ fast paths match full validation")
+
+
+def test_invalid_messages_rejected():
+    """Malformed fast-path messages are still rejected, not constructed"""
+    service = P2PEarthquakeService()
+    assert service._parse_response_data(b'{"code":561,"time":"t","area":"not a number"}') is None
+    assert service._parse_response_data(b'{"code":554,"time":"t"}') is None
+    assert service._parse_response_data(b'{"code":555,"time":"t"}') is None
+    assert service._parse_response_data(b'{"code":12345,"time":"t"}') is None
+    print("✓ invalid messages rejected")
+
+
+def test_parse_batch_preserves_order():
+    """A mixed batch keeps arrival order and drops only the invalid message"""
+    service = P2PEarthquakeService()
+    batch = [JMA_QUAKE, USER_QUAKE, EEW_DETECTION, b'{"code":561,"time":"t"}', AREA_PEERS.decode()]
+    parsed = service._parse_batch(batch)
+    assert [type(item) for item in parsed] == [JMAQuake, Userquake, EEWDetection, Areapeers]
+    assert [item.id for item in parsed] == ["q1", "uq1", "eew1", "peers1"]
+    assert parsed[0].earthquake.hypocenter.magnitude == 7.6
+    assert [(area.id, area.peer) for area in parsed[3].areas] == [(10, 3), (250, 42)]
+    print("✓ batch parse order")
+
+
+if __name__ == "__main__":
+    test_fast_paths_match_full_validation()
+    test_invalid_messages_rejected()
+    test_parse_batch_preserves_order()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for the social media schedule CRUD endpoints
+"""
+
+import sys
+import os
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient
+
+import main
+from social_media_automation import SocialMediaAutomation
+
+
+def _client_with_job():
+    """Attach a fresh automation service (without running the app lifespan) and create one job"""
+    main.social_media_automation = SocialMediaAutomation()
+    client = TestClient(main.app)
+    channel_id = next(iter(main.social_media_automation.channels), "test_channel")
+    response = client.post("/api/social-media/schedules", json={
+        "channel_ids": [channel_id],
+        "frequency_minutes": 15
+    })
+    assert response.status_code == 200, response.text
+    return client, response.json()["job_id"]
+
+
+def test_update_schedule_rejects_null():
+    """Explicit nulls for non-nullable fields are rejected with 422 and leave the job untouched"""
+    client, job_id = _client_with_job()
+    job = main.social_media_automation.recurring_jobs[job_id]
+    before = (list(job.channel_ids), job.mode, job.post_type, job.frequency_minutes, job.enabled)
+
+    for field in ("channel_ids", "mode", "post_type", "frequency_minutes", "enabled", "reset_next_run"):
+        response = client.patch(f"/api/social-media/schedules/{job_id}", json={field: None})
+        assert response.status_code == 422, (field, response.status_code, response.text)
+
+    after = (list(job.channel_ids), job.mode, job.post_type, job.frequency_minutes, job.enabled)
+    assert before == after
+    print("✓ null updates rejected with 422")
+
+
+def test_update_schedule_partial():
+    """Omitted fields are unchanged; targets/content may still be cleared with null"""
+    client, job_id = _client_with_job()
+    job = main.social_media_automation.recurring_jobs[job_id]
+
+    response = client.patch(f"/api/social-media/schedules/{job_id}", json={
+        "frequency_minutes": 5,
+        "targets": None
+    })
+    assert response.status_code == 200, response.text
+    assert job.frequency_minutes == 5
+    assert job.targets == []
+    assert job.enabled is True
+
+    response = client.patch("/api/social-media/schedules/missing", json={"enabled": False})
+    assert response.status_code == 404
+    print("✓ partial update applied")
+
+
+if __name__ == "__main__":
+    test_update_schedule_rejects_null()
+    test_update_schedule_partial()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for social media post template lookup
+Checks the (post type, disaster type, language) template index and the
+emergency content it produces
+"""
+
+import asyncio
+import sys
+import os
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Templates only; keep AI enhancement out of the rendered content
+os.environ.pop("OPENAI_API_KEY", None)
+
+from social_media_config import POST_TEMPLATES
+from social_media_service import SocialMediaAutomationService, SocialMediaChannel, PlatformType
+
+QUAKE = {"location": "東京湾", "magnitude": 5.2, "intensity": "5弱"}
+
+
+def _service():
+    return SocialMediaAutomationService(channels_config={})
+
+
+def _channel(language):
+    return SocialMediaChannel(
+        platform=PlatformType.LINE,
+        channel_id=f"test_{language}",
+        channel_name=f"Test {language}",
+        access_token="token",
+        language=language
+    )
+
+
+def test_templates_by_key():
+    """Every template is indexed under (post type, disaster type, language)"""
+    service = _service()
+    keys = service._templates_by_key
+
+    assert len(keys) == len(POST_TEMPLATES)
+    assert keys[("emergency_alert", "earthquake", "ja")].id == "emergency_earthquake_ja"
+    assert keys[("emergency_alert", "tsunami", "ja")].id == "emergency_tsunami_ja"
+    assert keys[("emergency_alert", "earthquake", "en")].id == "emergency_earthquake_en"
+    assert keys[("situation_update", "", "ja")].id == "situation_update_ja"
+    assert keys[("evacuation_order", "", "ja")].id == "evacuation_order_ja"
+    assert ("emergency_alert", "tsunami", "en") not in keys
+    print("✓ template index keys")
+
+
+def test_emergency_content_lookup():
+    """Emergency content uses the matching template, else the language's earthquake template"""
+    service = _service()
+
+    async def generate(language, disaster_type, data):
+        return await service._generate_emergency_content(_channel(language), disaster_type, data)
+
+    content = asyncio.run(generate("ja", "earthquake", QUAKE))
+    assert content == POST_TEMPLATES["emergency_earthquake_ja"]["template"].format(**QUAKE)
+
+    tsunami = {"location": "宮城県沿岸", "wave_height": 3, "arrival_time": "12:30"}
+    content = asyncio.run(generate("ja", "tsunami", tsunami))
+    assert content == POST_TEMPLATES["emergency_tsunami_ja"]["template"].format(**tsunami)
+
+    # No English tsunami template: falls back to the English earthquake one
+    content = asyncio.run(generate("en", "tsunami", QUAKE))
+    assert content == POST_TEMPLATES["emergency_earthquake_en"]["template"].format(**QUAKE)
+
+    # Missing template variables fall through to the built-in fallback text
+    content = asyncio.run(generate("ja", "earthquake", {"location": "東京湾"}))
+    assert content.startswith("🚨 地震発生 🚨")
+    print("✓ emergency template lookup")
+
+
+if __name__ == "__main__":
+    test_templates_by_key()
+    test_emergency_content_lookup()